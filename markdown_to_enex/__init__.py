@@ -2,15 +2,57 @@
 Markdown to ENEX Converter
 
 A Python application that converts a folder structure of markdown notes into Evernote's ENEX format.
+
+Submodules are imported on first attribute access, so that e.g. scanning a directory
+does not pay for importing the markdown engines.
 """
 
-from .config import Config, ConfigError
-from .scanner import DirectoryScanner, Note, scan_directory
-from .markdown_processor import MarkdownProcessor, process_markdown_file
-from .html_converter import HTMLConverter, convert_markdown_to_html
-from .enml_processor import ENMLProcessor, process_html_to_enml
-from .resource_handler import ResourceHandler, process_resources
-from .enex_generator import ENEXGenerator, generate_enex_file, extract_note_metadata, create_note_object
-from .enex_output import ENEXOutput, generate_output, get_best_group_by, ENEXOutputError
+import importlib
+from typing import Any, List
+
+__version__ = "0.1.0"
+
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "Config": ".config",
+    "ConfigError": ".config",
+    "DirectoryScanner": ".scanner",
+    "Note": ".scanner",
+    "scan_directory": ".scanner",
+    "MarkdownProcessor": ".markdown_processor",
+    "process_markdown_file": ".markdown_processor",
+    "HTMLConverter": ".html_converter",
+    "convert_markdown_to_html": ".html_converter",
+    "ENMLProcessor": ".enml_processor",
+    "process_html_to_enml": ".enml_processor",
+    "ResourceHandler": ".resource_handler",
+    "process_resources": ".resource_handler",
+    "ENEXGenerator": ".enex_generator",
+    "ENEXNote": ".enex_generator",
+    "generate_enex_file": ".enex_generator",
+    "write_enex_file": ".enex_generator",
+    "extract_note_metadata": ".enex_generator",
+    "create_note_object": ".enex_generator",
+    "parse_date": ".enex_generator",
+    "ENEXOutput": ".enex_output",
+    "generate_output": ".enex_output",
+    "get_best_group_by": ".enex_output",
+    "ENEXOutputError": ".enex_output",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES) + ["__version__"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule defining a public name on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__version__ = "0.1.0"
\ No newline at end of file
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
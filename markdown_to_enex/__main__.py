@@ -1,19 +1,260 @@
 import argparse
+import itertools
 import json
+import os
 import sys
 import datetime
+import io
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Any, List, Set, Tuple, Optional, Iterator, TextIO
 
+from .cache import ConversionCache, get_cache, make_cache_key
 from .config import Config, ConfigError
 from .scanner import scan_directory
 from .markdown_processor import process_markdown_file
-from .html_converter import convert_markdown_to_html
-from .enml_processor import process_html_to_enml
-from .resource_handler import process_resources
-from .enex_generator import extract_note_metadata, create_note_object, generate_enex_file
+from .enex_generator import get_generator, parse_date, generate_enex_file, open_output_file
 from .enex_output import generate_output, get_best_group_by, ENEXOutputError
 
+# Processing options that only control parallelism; they do not change the
+# processed markdown, so they are left out of its cache key
+PARALLELISM_OPTIONS = ("workers", "scan_threads")
+
+
+class _ProgressReporter:
+    """Collects progress messages and writes them to the console in batches.
+    
+    Printing one line per note flushes the console on every call, which becomes
+    noticeable on large runs. Messages are buffered and written every
+    flush_every lines or flush_interval seconds, whichever comes first.
+    """
+    
+    def __init__(self, flush_every: int = 100, flush_interval: float = 0.25, stream: Optional[TextIO] = None):
+        """Initialize the progress reporter.
+        
+        Args:
+            flush_every: Number of buffered messages that triggers a write
+            flush_interval: Maximum number of seconds a message stays buffered
+            stream: Output stream (defaults to sys.stdout)
+        """
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.stream = stream
+        self._buffer = io.StringIO()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        
+    def log(self, message: str) -> None:
+        """Queue a progress message.
+        
+        Args:
+            message: Message to report
+        """
+        self._buffer.write(message)
+        self._buffer.write("\n")
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+            
+    def flush(self) -> None:
+        """Write all queued messages."""
+        if self._pending:
+            stream = self.stream or sys.stdout
+            stream.write(self._buffer.getvalue())
+            stream.flush()
+            self._buffer = io.StringIO()
+            self._pending = 0
+        self._last_flush = time.monotonic()
+        
+    def __enter__(self) -> "_ProgressReporter":
+        return self
+        
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
+
+
+def _write_utf8(path: Any, text: str) -> None:
+    """Write text to a file as UTF-8 with a single write call.
+    
+    Args:
+        path: Path of the file to write
+        text: Text content
+    """
+    data = text.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _cached_process_markdown_file(file_path: str, config: Dict[str, Any], cache: Optional[ConversionCache]) -> Tuple[str, Set[str], Dict[str, Any], List[Any]]:
+    """Process a markdown file, reusing a cached result if the file is unchanged.
+    
+    Args:
+        file_path: Path to the markdown file
+        config: Configuration dictionary
+        cache: Conversion cache, or None if caching is disabled
+        
+    Returns:
+        Tuple of (processed_content, resource_references, frontmatter_metadata, image_registry)
+    """
+    if cache is None:
+        return process_markdown_file(file_path, config)
+        
+    stat = os.stat(file_path)
+    processing_options = {
+        name: value for name, value in config.get("processing_options", {}).items()
+        if name not in PARALLELISM_OPTIONS
+    }
+    key = make_cache_key(
+        os.path.abspath(file_path), str(stat.st_mtime_ns), str(stat.st_size),
+        processing_options
+    )
+    result = cache.get("markdown", key)
+    if result is None:
+        result = process_markdown_file(file_path, config)
+        cache.set("markdown", key, result)
+    return result
+
+
+def _cached_convert_markdown_to_html(markdown_content: str, config: Dict[str, Any], cache: Optional[ConversionCache]) -> str:
+    """Convert markdown to HTML, reusing a cached result for identical input.
+    
+    Args:
+        markdown_content: Processed markdown content
+        config: Configuration dictionary
+        cache: Conversion cache, or None if caching is disabled
+        
+    Returns:
+        HTML content
+    """
+    # Imported here so that --scan-only does not load the markdown engines
+    from .html_converter import convert_markdown_to_html
+    
+    if cache is None:
+        return convert_markdown_to_html(markdown_content, config)
+        
+    key = make_cache_key(markdown_content, config.get("html_options", {}))
+    html_content = cache.get("html", key)
+    if html_content is None:
+        html_content = convert_markdown_to_html(markdown_content, config)
+        cache.set("html", key, html_content)
+    return html_content
+
+
+def _process_note(note_info: Dict[str, Any], config: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+    """Run the conversion pipeline for a single scanned note.
+    
+    Defined at module level so it can be dispatched to worker processes.
+    
+    Args:
+        note_info: Note information dictionary from the scanner
+        config: Configuration dictionary
+        
+    Returns:
+        Tuple of (note object, resource references), or None if the note could
+        not be processed
+    """
+    from .enml_processor import process_html_to_enml
+    
+    file_path = note_info['file_path']
+    cache = get_cache(config)
+    
+    # One generator serves metadata extraction, date parsing and note creation
+    generator = get_generator(config)
+    
+    try:
+        # Process markdown
+        processed_markdown, resources, frontmatter, image_registry = _cached_process_markdown_file(file_path, config, cache)
+        
+        # Convert to HTML
+        html_content = _cached_convert_markdown_to_html(processed_markdown, config, cache)
+        
+        # Process HTML to ENML with image registry
+        enml_content, _ = process_html_to_enml(html_content, resources, config, image_registry)
+        
+        # Extract metadata from file
+        metadata = generator.extract_note_metadata(file_path, processed_markdown)
+        
+        # Override with frontmatter metadata (it takes precedence)
+        for key, value in frontmatter.items():
+            # Special handling for string dates that didn't parse properly
+            if key in ('created', 'updated', 'date') and isinstance(value, str):
+                # Try the ENEX generator's date parser; if parsing fails, keep the string value
+                parsed_date = parse_date(value)
+                metadata[key] = parsed_date if parsed_date is not None else value
+            else:
+                metadata[key] = value
+        
+        # Create a note object
+        title = metadata["title"] if "title" in metadata else note_info['stem']
+        created_date = metadata.get("created", metadata.get("file_created", datetime.datetime.now()))
+        updated_date = metadata.get("updated", metadata.get("file_modified", created_date))
+        tags = metadata.get("tags", [])
+        
+        # Add folder information as notebook if specified
+        notebook = None
+        if note_info.get("folder_path"):
+            notebook = note_info.get("folder_path")
+        
+        note = generator.create_note_object(
+            title=title,
+            content=enml_content,
+            resources=[],  # We'll add resources in the next step
+            created_date=created_date,
+            updated_date=updated_date,
+            tags=tags,
+            notebook=notebook
+        )
+        
+        return note, resources
+        
+    except Exception as e:
+        print(f"  Error processing note {file_path}: {e}")
+        return None
+
+
+def _resolve_workers(config: Dict[str, Any]) -> int:
+    """Determine how many worker processes to use for note processing.
+    
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        Number of worker processes (1 means process notes in this process)
+    """
+    workers = config.get("processing_options", {}).get("workers", 0)
+    if not workers or workers < 1:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _map_notes(notes: List[Dict[str, Any]], config: Dict[str, Any], workers: int) -> Iterator[Optional[Tuple[Dict[str, Any], Set[str]]]]:
+    """Process notes, in parallel when more than one worker is available.
+    
+    Results are yielded in the same order as the input notes.
+    
+    Args:
+        notes: List of note information dictionaries from the scanner
+        config: Configuration dictionary
+        workers: Number of worker processes to use
+        
+    Yields:
+        The result of _process_note for each note
+    """
+    if workers <= 1 or len(notes) <= 1:
+        for note_info in notes:
+            yield _process_note(note_info, config)
+        return
+        
+    workers = min(workers, len(notes))
+    
+    # Send notes to the workers in batches to amortize the inter-process overhead
+    chunksize = max(1, len(notes) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_process_note, notes, itertools.repeat(config), chunksize=chunksize)
+
 
 def main():
     """Main entry point for the Markdown to ENEX converter."""
@@ -35,10 +276,16 @@ def main():
         action="store_true",
         help="Only scan the directory structure without conversion"
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the scan result written by --scan-only"
+    )
     parser.add_argument(
         "--test-convert",
         metavar="FILE",
-        help="Test conversion on a single markdown file"
+        nargs="+",
+        help="Test conversion on one or more markdown files"
     )
     parser.add_argument(
         "--verbose",
@@ -60,6 +307,16 @@ def main():
         type=int,
         help="Maximum number of notes per ENEX file (0 for no limit)"
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Cache intermediate conversion results to speed up repeated runs"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes for note conversion (0 for one per CPU, 1 to disable parallelism)"
+    )
     
     args = parser.parse_args()
     
@@ -68,10 +325,20 @@ def main():
         config = Config(args.config)
         
         # Override config with command line arguments if provided
+        overrides: Dict[str, Any] = {}
         if args.source:
-            config.set("source_directory", args.source)
+            overrides["source_directory"] = args.source
         if args.output:
-            config.set("output_directory", str(Path(args.output).parent if args.output.endswith(".enex") else args.output))
+            overrides["output_directory"] = str(Path(args.output).parent if args.output.endswith(".enex") else args.output)
+        if args.workers is not None:
+            overrides["processing_options"] = {"workers": args.workers}
+        if overrides:
+            config.update(overrides)
+        
+        if args.cache:
+            cache_options = config.get("cache_options", {})
+            cache_options["enabled"] = True
+            config.set("cache_options", cache_options)
         
         # Enable verbose mode if requested
         verbose = args.verbose
@@ -100,14 +367,11 @@ def main():
         print(f"Found {scan_result['total_notes']} notes and {scan_result['total_resources']} resources.")
         
         # Show planned ENEX files based on folder structure
-        enex_files = {}
-        for note in scan_result['notes']:
-            enex_file = note['enex_filename']
-            if enex_file not in enex_files:
-                enex_files[enex_file] = []
-            enex_files[enex_file].append(note)
-        
         if verbose or args.separate_files:
+            enex_files = defaultdict(list)
+            for note in scan_result['notes']:
+                enex_files[note['enex_filename']].append(note)
+                
             print("\nPlanned ENEX files based on folder structure:")
             for enex_file, notes in enex_files.items():
                 print(f"  - {enex_file}: {len(notes)} notes")
@@ -115,51 +379,57 @@ def main():
         # If scan-only mode, print the structure and exit
         if args.scan_only:
             output_file = Path(config.get("output_directory", ".")) / "scan_result.json"
-            with open(output_file, "w") as f:
-                json.dump(scan_result, f, indent=2)
+            with open_output_file(output_file) as f:
+                if args.pretty:
+                    json.dump(scan_result, f, indent=2, ensure_ascii=False)
+                else:
+                    json.dump(scan_result, f, separators=(",", ":"), ensure_ascii=False)
             print(f"Scan result saved to: {output_file}")
             return
             
         # Test conversion on a single file if requested
         if args.test_convert:
-            test_file = args.test_convert
-            print(f"Testing conversion on: {test_file}")
+            config_dict = config.to_dict()
+            output_dir = Path(config.get("output_directory", "."))
             
-            try:
-                # Process markdown
-                processed_markdown, resources, frontmatter, image_registry = process_markdown_file(test_file, config.to_dict())
-                print(f"Processed markdown and found {len(resources)} resource references")
-                print(f"Extracted metadata: {frontmatter}")
-                
-                # Convert to HTML
-                html_content = convert_markdown_to_html(processed_markdown, config.to_dict())
-                
-                # Process HTML to ENML with image registry
-                enml_content, _ = process_html_to_enml(html_content, resources, config.to_dict(), image_registry)
-                
-                # Save the results
-                output_dir = Path(config.get("output_directory", "."))
-                base_name = Path(test_file).stem
-                
-                md_output = output_dir / f"{base_name}_processed.md"
-                html_output = output_dir / f"{base_name}.html"
+            from .html_converter import convert_markdown_to_html
+            from .enml_processor import process_html_to_enml
+            
+            # All files share one process, so the markdown engine is only built once
+            for test_file in args.test_convert:
+                print(f"Testing conversion on: {test_file}")
                 
-                with open(md_output, "w", encoding="utf-8") as f:
-                    f.write(processed_markdown)
+                try:
+                    # Process markdown
+                    processed_markdown, resources, frontmatter, image_registry = process_markdown_file(test_file, config_dict)
+                    print(f"Processed markdown and found {len(resources)} resource references")
+                    print(f"Extracted metadata: {frontmatter}")
                     
-                with open(html_output, "w", encoding="utf-8") as f:
-                    f.write(html_content)
+                    # Convert to HTML
+                    html_content = convert_markdown_to_html(processed_markdown, config_dict)
                     
-                print(f"Processed markdown saved to: {md_output}")
-                print(f"HTML content saved to: {html_output}")
-                
-            except Exception as e:
-                print(f"Error converting file: {e}")
+                    # Process HTML to ENML with image registry
+                    enml_content, _ = process_html_to_enml(html_content, resources, config_dict, image_registry)
+                    
+                    # Save the results
+                    base_name = Path(test_file).stem
+                    
+                    md_output = output_dir / f"{base_name}_processed.md"
+                    html_output = output_dir / f"{base_name}.html"
+                    
+                    _write_utf8(md_output, processed_markdown)
+                    _write_utf8(html_output, html_content)
+                        
+                    print(f"Processed markdown saved to: {md_output}")
+                    print(f"HTML content saved to: {html_output}")
+                    
+                except Exception as e:
+                    print(f"Error converting file: {e}")
                 
             return
         
         # Configure output options
-        if "output_options" not in config.to_dict():
+        if config.get("output_options") is None:
             config.set("output_options", {})
             
         # Determine output path and directory
@@ -210,125 +480,76 @@ def main():
         # Full conversion process
         print("Starting full conversion process...")
         
-        # Process all notes
+        # Track processed notes for output module as parallel lists, so later
+        # passes only touch the fields they need
         final_notes = []
-        all_resources = set()
-        
-        # Track processed notes for output module
-        processed_notes = []
+        note_resource_refs = []
+        note_info_list = []
         note_count = 0
-        resource_count = 0
         
         print(f"Processing {scan_result['total_notes']} notes...")
-        for note_info in scan_result['notes']:
-            note_count += 1
-            file_path = note_info['file_path']
-            if verbose:
-                print(f"  Processing note {note_count}/{scan_result['total_notes']}: {Path(file_path).name}")
-            
-            # Process markdown
-            try:
-                processed_markdown, resources, frontmatter, image_registry = process_markdown_file(file_path, config.to_dict())
-                
-                # Track all resources
-                all_resources.update(resources)
-                resource_count += len(resources)
-                
-                # Convert to HTML
-                html_content = convert_markdown_to_html(processed_markdown, config.to_dict())
-                
-                # Process HTML to ENML with image registry
-                enml_content, _ = process_html_to_enml(html_content, resources, config.to_dict(), image_registry)
-                
-                # Extract metadata from file
-                metadata = extract_note_metadata(file_path, processed_markdown, config.to_dict())
-                
-                # Override with frontmatter metadata (it takes precedence)
-                for key, value in frontmatter.items():
-                    # Special handling for string dates that didn't parse properly
-                    if key in ('created', 'updated', 'date') and isinstance(value, str):
-                        try:
-                            # Try to use the ENEX generator's date parser
-                            from .enex_generator import ENEXGenerator
-                            generator = ENEXGenerator(config.to_dict())
-                            parsed_date = generator._parse_date(value)
-                            metadata[key] = parsed_date
-                        except Exception:
-                            # If parsing fails, keep the string value
-                            metadata[key] = value
-                    else:
-                        metadata[key] = value
-                
-                # Create a note object
-                title = metadata.get("title", Path(file_path).stem)
-                created_date = metadata.get("created", metadata.get("file_created", datetime.datetime.now()))
-                updated_date = metadata.get("updated", metadata.get("file_modified", created_date))
-                tags = metadata.get("tags", [])
-                
-                # Add folder information as notebook if specified
-                notebook = None
-                if note_info.get("folder_path"):
-                    notebook = note_info.get("folder_path")
-                
-                note = create_note_object(
-                    title=title,
-                    content=enml_content,
-                    resources=[],  # We'll add resources in the next step
-                    config=config.to_dict(),
-                    created_date=created_date,
-                    updated_date=updated_date,
-                    tags=tags,
-                    notebook=notebook
-                )
-                
-                processed_notes.append((note, resources, note_info))
+        config_dict = config.to_dict()
+        workers = _resolve_workers(config_dict)
+        with _ProgressReporter() as reporter:
+            # Results come back in input order, so pair each with its scanned note info
+            for note_info, result in zip(scan_result['notes'], _map_notes(scan_result['notes'], config_dict, workers)):
+                note_count += 1
+                if result is None:
+                    continue
+                    
+                note, resources = result
+                if verbose:
+                    reporter.log(f"  Processed note {note_count}/{scan_result['total_notes']}: {note_info['name']}")
                 
-            except Exception as e:
-                print(f"  Error processing note {file_path}: {e}")
+                final_notes.append(note)
+                note_resource_refs.append(resources)
+                note_info_list.append(note_info)
+        
+        # Collect the unique resources referenced by all notes in one pass
+        all_resources = set().union(*note_resource_refs)
+        resource_count = sum(map(len, note_resource_refs))
         
         print(f"Processed {note_count} notes with {resource_count} total resource references")
         
         # Process all resources
         print(f"Processing resources...")
-        resource_objects = process_resources(all_resources, config.to_dict())
+        from .resource_handler import process_resources
+        resource_objects = process_resources(all_resources, config_dict)
         print(f"Processed {len(resource_objects)} unique resources")
         
         # Create a lookup map for resources
-        resource_map = {}
-        for resource in resource_objects:
-            resource_map[resource['reference']] = resource
+        resource_map = {resource['reference']: resource for resource in resource_objects}
         
         # Build final notes with resources
         print(f"Building final notes with resources...")
-        final_notes = []
-        note_info_list = []
-        
-        for note, note_resources, note_info in processed_notes:
-            # Add only the resources referenced by this note
-            note_resource_objects = []
-            for ref in note_resources:
-                if ref in resource_map:
-                    note_resource_objects.append(resource_map[ref])
-            
-            note['resources'] = note_resource_objects
-            final_notes.append(note)
-            note_info_list.append(note_info)
-            
-            # Count resources for reporting
-            if verbose:
-                print(f"  Note '{note['title']}' with {len(note_resource_objects)} resources")
+        with _ProgressReporter() as reporter:
+            for note, note_resources in zip(final_notes, note_resource_refs):
+                # Add only the resources referenced by this note. Different references
+                # can resolve to the same file, so keep one resource per content hash.
+                note_resource_objects = [resource_map[ref] for ref in note_resources if ref in resource_map]
+                if len(note_resource_objects) > 1:
+                    resources_by_hash = {}
+                    for resource in note_resource_objects:
+                        resources_by_hash.setdefault(resource['hash'], resource)
+                    note_resource_objects = list(resources_by_hash.values())
+                
+                note['resources'] = note_resource_objects
+                
+                # Count resources for reporting
+                if verbose:
+                    reporter.log(f"  Note '{note['title']}' with {len(note_resource_objects)} resources")
         
         # Generate ENEX output
         print(f"Generating ENEX output...")
         try:
             # Use new ENEX output module to generate files
-            output_files = generate_output(final_notes, note_info_list, config.to_dict())
+            file_sizes = {}
+            output_files = generate_output(final_notes, note_info_list, config_dict, file_sizes)
             
             # Print summary
             print(f"\nSuccessfully created {len(output_files)} ENEX files:")
             for group_name, output_path in output_files.items():
-                file_size = Path(output_path).stat().st_size
-                print(f"  - {output_path} ({file_size:,} bytes)")
+                print(f"  - {output_path} ({file_sizes[output_path]:,} bytes)")
                 
             print(f"\nYou can now import these files into Evernote.")
             
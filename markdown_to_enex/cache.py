@@ -0,0 +1,119 @@
+"""
+Conversion Cache Module
+
+This module provides a small on-disk cache for intermediate conversion results, so that
+re-running the converter over an unchanged set of notes can skip deterministic work.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Name of the cache directory created inside the output directory by default
+DEFAULT_CACHE_DIRECTORY = ".md2enex_cache"
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a cache key from a sequence of values.
+
+    Strings are hashed directly; other values are serialized to JSON first, so
+    option dictionaries produce the same key regardless of key order.
+
+    Args:
+        *parts: Values that determine the cached result
+
+    Returns:
+        Hexadecimal cache key
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Stores pickled conversion results on disk, grouped by namespace."""
+
+    def __init__(self, cache_dir: str):
+        """Initialize the conversion cache.
+
+        Args:
+            cache_dir: Directory where cached results are stored
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            namespace: Cache namespace (e.g. "html")
+            key: Cache key
+
+        Returns:
+            The cached value, or None if it is not cached or cannot be read
+        """
+        try:
+            with open(self._entry_path(namespace, key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a value in the cache.
+
+        The entry is written to a temporary file and moved into place, so that
+        concurrent workers never observe a partially written entry.
+
+        Args:
+            namespace: Cache namespace (e.g. "html")
+            key: Cache key
+            value: Picklable value to store
+        """
+        entry_path = self._entry_path(namespace, key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            # A cache that cannot be written should never fail the conversion
+            print(f"Warning: Could not write cache entry {entry_path}: {e}")
+
+    def _entry_path(self, namespace: str, key: str) -> Path:
+        """Get the file path for a cache entry.
+
+        Args:
+            namespace: Cache namespace
+            key: Cache key
+
+        Returns:
+            Path to the cache entry file
+        """
+        return self.cache_dir / namespace / f"{key}.pickle"
+
+
+def get_cache(config: Dict[str, Any]) -> Optional[ConversionCache]:
+    """Get the conversion cache configured for this run.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        ConversionCache instance, or None if caching is disabled
+    """
+    cache_options = config.get("cache_options", {})
+    if not cache_options.get("enabled", False):
+        return None
+
+    cache_dir = cache_options.get("directory") or os.path.join(
+        config.get("output_directory") or ".", DEFAULT_CACHE_DIRECTORY
+    )
+    return ConversionCache(cache_dir)
@@ -1,7 +1,20 @@
+import copy
+import functools
 import json
 import os
+import stat
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Generic, Optional, TypeVar
+
+# Use orjson for reading and writing configuration files when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+T = TypeVar("T")
 
 
 class ConfigError(Exception):
@@ -9,6 +22,103 @@ class ConfigError(Exception):
     pass
 
 
+class ConfigMemo(Generic[T]):
+    """Reuses an object built from a configuration while the configuration is unchanged.
+    
+    The object is rebuilt when a call passes a configuration with a different value,
+    including one edited in place since the object was built. A snapshot of the
+    configuration is kept for the comparison, so the caller's dictionaries are
+    never held on to by identity.
+    """
+    
+    def __init__(self, factory: Callable[[Dict[str, Any]], T]):
+        """Initialize the memo.
+        
+        Args:
+            factory: Builds the object from a configuration dictionary.
+        """
+        self._factory = factory
+        self._config: Optional[Dict[str, Any]] = None
+        self._instance: Optional[T] = None
+        
+    def get(self, config: Dict[str, Any]) -> T:
+        """Get the object for the given configuration.
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            The object from the previous call if the configuration is equal, otherwise
+            a newly built one
+        """
+        if self._instance is None or self._config != config:
+            self._instance = self._factory(config)
+            self._config = copy.deepcopy(config)
+        return self._instance
+
+
+def _loads_json(data: bytes) -> Any:
+    """Parse JSON data.
+    
+    Args:
+        data: Encoded JSON document.
+        
+    Returns:
+        The parsed JSON data.
+        
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON.
+    """
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_json(obj: Any) -> bytes:
+    """Serialize data as indented JSON.
+    
+    Args:
+        obj: Data to serialize.
+        
+    Returns:
+        The UTF-8 encoded JSON document.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_file(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Load and parse a JSON file.
+    
+    The modification time is part of the cache key, so a file changed on disk
+    is parsed again.
+    
+    Args:
+        path: Path to the JSON file.
+        mtime_ns: Modification time of the file in nanoseconds.
+        
+    Returns:
+        The parsed JSON data (shared; callers must copy it before modifying).
+    """
+    with open(path, "rb") as f:
+        return _loads_json(f.read())
+
+
+def _read_json_file(path: str) -> Dict[str, Any]:
+    """Read a JSON configuration file, reusing the parsed result while it is unchanged.
+    
+    Args:
+        path: Path to the JSON file.
+        
+    Returns:
+        A private copy of the parsed JSON data.
+    """
+    return copy.deepcopy(_load_json_file(path, os.stat(path).st_mtime_ns))
+
+
 class Config:
     """Configuration manager for the Markdown to ENEX converter.
     
@@ -45,8 +155,7 @@ class Config:
         default_config_path = Path(__file__).parent.parent / "config" / "default_config.json"
         
         try:
-            with open(default_config_path, "r") as f:
-                self.config = json.load(f)
+            self.config = _read_json_file(str(default_config_path))
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise ConfigError(f"Error loading default configuration: {e}")
     
@@ -57,35 +166,45 @@ class Config:
             config_path: Path to the custom configuration file.
         """
         try:
-            with open(config_path, "r") as f:
-                custom_config = json.load(f)
-                
-            # Merge processing_options separately to prevent complete overwrite
-            if "processing_options" in custom_config and "processing_options" in self.config:
-                self.config["processing_options"].update(custom_config.pop("processing_options", {}))
-                
-            # Update the rest of the config
-            self.config.update(custom_config)
+            custom_config = _read_json_file(config_path)
+            self._merge_config(custom_config)
                 
         except (FileNotFoundError, json.JSONDecodeError) as e:
             raise ConfigError(f"Error loading custom configuration: {e}")
     
+    def _merge_config(self, custom_config: Dict[str, Any]) -> None:
+        """Merge configuration values into the current configuration.
+        
+        Args:
+            custom_config: Configuration values to merge.
+        """
+        custom_config = dict(custom_config)
+        
+        # Merge processing_options separately to prevent complete overwrite
+        if "processing_options" in custom_config and "processing_options" in self.config:
+            self.config["processing_options"].update(custom_config.pop("processing_options", {}))
+            
+        # Update the rest of the config
+        self.config.update(custom_config)
+    
     def _validate_config(self) -> None:
         """Validate the configuration values."""
-        # Validate source_directory if provided
+        # Validate source_directory if provided, with a single stat call
         if self.config.get("source_directory"):
-            source_dir = Path(self.config["source_directory"])
-            if not source_dir.exists() or not source_dir.is_dir():
-                raise ConfigError(f"Source directory does not exist: {source_dir}")
+            source_dir = self.config["source_directory"]
+            try:
+                source_is_dir = stat.S_ISDIR(os.stat(source_dir).st_mode)
+            except OSError:
+                source_is_dir = False
+            if not source_is_dir:
+                raise ConfigError(f"Source directory does not exist: {Path(source_dir)}")
                 
-        # Validate output_directory if provided
+        # Validate output_directory if provided; makedirs is a no-op when it exists
         if self.config.get("output_directory"):
-            output_dir = Path(self.config["output_directory"])
-            if not output_dir.exists():
-                try:
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                except OSError as e:
-                    raise ConfigError(f"Cannot create output directory: {e}")
+            try:
+                os.makedirs(self.config["output_directory"], exist_ok=True)
+            except OSError as e:
+                raise ConfigError(f"Cannot create output directory: {e}")
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value.
@@ -107,6 +226,32 @@ class Config:
             value: The value to set.
         """
         self.config[key] = value
+    
+    def update(self, values: Dict[str, Any]) -> None:
+        """Merge several configuration values at once.
+        
+        The values are merged the same way as a custom configuration file, and
+        the result is validated once after all of them have been applied.
+        
+        Args:
+            values: Mapping of configuration keys to values.
+        """
+        self._merge_config(values)
+        self._validate_config()
+    
+    @classmethod
+    def from_dict(cls, config_dict: Dict[str, Any]) -> "Config":
+        """Create a configuration from a dictionary of overrides.
+        
+        Args:
+            config_dict: Configuration values to merge over the defaults.
+            
+        Returns:
+            The new configuration.
+        """
+        config = cls()
+        config.update(config_dict)
+        return config
         
     def to_dict(self) -> Dict[str, Any]:
         """Return the configuration as a dictionary.
@@ -123,7 +268,8 @@ class Config:
             filepath: Path where to save the configuration.
         """
         try:
-            with open(filepath, "w") as f:
-                json.dump(self.config, f, indent=2)
+            data = _dumps_json(self.config)
+            with open(filepath, "wb") as f:
+                f.write(data)
         except OSError as e:
             raise ConfigError(f"Error saving configuration: {e}")
\ No newline at end of file
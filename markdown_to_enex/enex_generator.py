@@ -1,17 +1,186 @@
+import dataclasses
+import functools
 import os
 import re
 import datetime
-import uuid
-import xml.sax.saxutils as saxutils
-from pathlib import Path
-from typing import Dict, Any, List, Set, Tuple, Optional
+from string import Template
+from typing import Dict, Any, List, Set, Tuple, Optional, Callable, TextIO
 
-# Regular expressions for extracting metadata
-TITLE_RE = re.compile(r'^#\s+(.*?)$', re.MULTILINE)
-DATE_RE = re.compile(r'^date:\s*(.*?)$', re.MULTILINE | re.IGNORECASE)
-CREATED_RE = re.compile(r'^created:\s*(.*?)$', re.MULTILINE | re.IGNORECASE)
-UPDATED_RE = re.compile(r'^updated:\s*(.*?)$', re.MULTILINE | re.IGNORECASE)
-TAGS_RE = re.compile(r'^tags:\s*(.*?)$', re.MULTILINE | re.IGNORECASE)
+from .config import ConfigMemo
+from .resource_handler import iter_resource_base64
+
+# Add conditional zstandard import for compressed output
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Title heading and "key: value" lines, found in a single pass. The alternatives sit
+# inside a lookahead so matches never consume text and overlapping lines are still
+# seen; the name of the matched group says which key a match belongs to.
+METADATA_RE = re.compile(
+    r'^(?=#\s+(?P<title>.*?)$'
+    r'|(?i:date):\s*(?P<date>.*?)$'
+    r'|(?i:created):\s*(?P<created>.*?)$'
+    r'|(?i:updated):\s*(?P<updated>.*?)$'
+    r'|(?i:tags):\s*(?P<tags>.*?)$)',
+    re.MULTILINE,
+)
+
+# ISO dates that datetime.fromisoformat parses exactly like the matching strptime formats
+ISO_DATE_RE = re.compile(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}:[0-9]{2})?$')
+
+# Date formats accepted by _parse_date, tried in order
+DATE_FORMATS = (
+    "%Y-%m-%d",             # 2023-01-01
+    "%Y-%m-%d %H:%M:%S",    # 2023-01-01 12:30:45
+    "%Y-%m-%dT%H:%M:%S",    # 2023-01-01T12:30:45
+    "%Y-%m-%dT%H:%M:%SZ",   # 2023-01-01T12:30:45Z
+    "%Y%m%dT%H%M%SZ",       # 20230101T123045Z
+    "%d/%m/%Y",             # 01/01/2023
+    "%m/%d/%Y",             # 01/01/2023
+    "%b %d, %Y",            # Jan 01, 2023
+    "%d %b %Y",             # 01 Jan 2023
+    "%B %d, %Y",            # January 01, 2023
+    "%d %B %Y",             # 01 January 2023
+    "%Y/%m/%d",             # 2023/01/01
+)
+
+# Line length for base64 resource data; resource_handler.READ_CHUNK_SIZE encodes
+# to a whole number of these lines
+BASE64_LINE_LENGTH = 120
+
+# Compression level for zstd output; level 3 is zstd's default speed/ratio trade-off
+ZSTD_LEVEL = 3
+
+# Write buffer for output files; ENEX files with embedded resources can be very large
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Skeleton of the ENEX document header, parsed once at import time
+ENEX_HEADER_TEMPLATE = Template("""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE en-export SYSTEM "http://xml.evernote.com/pub/evernote-export3.dtd">
+<en-export export-date="$export_date" application="$application_name" version="$enex_version">
+""")
+
+
+def _escape_xml(text: str) -> str:
+    """Escape &, < and > in a string for use as XML text.
+    
+    Args:
+        text: Text to escape
+        
+    Returns:
+        Escaped text
+    """
+    # Chained str.replace is cheaper than str.translate for multi-character
+    # replacements, and returns quickly when there is nothing to escape
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _new_guid() -> str:
+    """Generate a random (version 4) UUID string.
+    
+    Equivalent to str(uuid.uuid4()) without building a UUID object.
+    
+    Returns:
+        UUID in the canonical 8-4-4-4-12 hexadecimal form
+    """
+    b = bytearray(os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def open_output_file(path: Any) -> TextIO:
+    """Open a UTF-8 text file for writing with a large write buffer.
+    
+    Args:
+        path: Path of the file to write
+        
+    Returns:
+        Open text file object
+    """
+    return open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+
+
+@dataclasses.dataclass
+class ENEXNote:
+    """A note ready to be written to an ENEX file.
+    
+    Uses __slots__ to keep per-note memory small on large exports. Item access
+    (note["title"], note.get("tags"), "source_url" in note) is supported so code
+    written against the earlier note dictionaries keeps working.
+    """
+    
+    __slots__ = ("title", "content", "created", "updated", "author", "resources",
+                 "tags", "notebook", "source_url", "guid", "metadata")
+    
+    title: str
+    content: str
+    created: datetime.datetime
+    updated: datetime.datetime
+    author: Optional[str]
+    resources: List[Dict[str, Any]]
+    tags: List[str]
+    notebook: Optional[str]
+    source_url: Optional[str]
+    guid: str
+    metadata: Dict[str, Any]
+    
+    @classmethod
+    def from_dict(cls, note: Dict[str, Any]) -> "ENEXNote":
+        """Create a note from a note dictionary.
+        
+        Args:
+            note: Note dictionary with at least "title" and "content"
+            
+        Returns:
+            ENEXNote instance
+        """
+        return cls(
+            title=note["title"],
+            content=note["content"],
+            created=note.get("created"),
+            updated=note.get("updated"),
+            author=note.get("author"),
+            resources=note.get("resources", []),
+            tags=note.get("tags", []),
+            notebook=note.get("notebook"),
+            source_url=note.get("source_url"),
+            guid=note.get("guid", ""),
+            metadata=note.get("metadata", {}),
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the note as a dictionary.
+        
+        Returns:
+            Note dictionary
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: object) -> bool:
+        # Like a dictionary holding only the fields that are set: fields left as
+        # None count as absent
+        return key in self.__slots__ and getattr(self, key, None) is not None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field by name, like dict.get."""
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
 
 
 class ENEXGenerator:
@@ -35,38 +204,96 @@ class ENEXGenerator:
         self.enex_version = self.enex_options.get("enex_version", "1.0")
         self.application_name = self.enex_options.get("application_name", "markdown-to-enex")
         
+        # Escape the default author once; most notes use it
+        self._default_author_escaped = _escape_xml(self.default_author)
+        
+        # Start of each note's XML, specialized for the enabled date elements
+        self._note_head_template = (
+            "  <note>\n    <title>{title}</title>\n"
+            + ("    <created>{created}</created>\n" if self.add_creation_date else "")
+            + ("    <updated>{updated}</updated>\n" if self.add_update_date else "")
+        )
+        
     def generate_enex_file(self, notes: List[Dict[str, Any]], output_path: Optional[str] = None) -> str:
         """Generate an ENEX file from a list of notes.
         
+        When an output path is given, the document is written to the file note by
+        note instead of being assembled in memory first.
+        
         Args:
             notes: List of note dictionaries
             output_path: Optional path to save the ENEX file
             
         Returns:
-            ENEX content as string
+            ENEX content as string, or an empty string if it was written to output_path
+        """
+        if output_path:
+            self.write_enex_file(notes, output_path)
+            return ""
+            
+        # Collect the fragments and join them once; join sizes the result exactly
+        # instead of growing a buffer as fragments arrive
+        parts: List[str] = []
+        self._write_enex(notes, parts.append)
+        return "".join(parts)
+    
+    def write_enex_file(self, notes: List[Dict[str, Any]], output_path: str, compression: Optional[str] = None,
+                        compression_threads: int = -1) -> int:
+        """Write an ENEX file note by note.
+        
+        Args:
+            notes: List of note dictionaries
+            output_path: Path of the ENEX file
+            compression: "zstd" to write a zstd-compressed file (requires the
+                zstandard package), or None to write plain XML
+            compression_threads: zstd worker threads; -1 uses one per CPU and
+                0 compresses in the calling thread
+            
+        Returns:
+            Size of the written file in bytes
+        """
+        if compression == "zstd":
+            with open(output_path, "wb", buffering=WRITE_BUFFER_SIZE) as raw:
+                compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=compression_threads)
+                with compressor.stream_writer(raw, closefd=False) as stream:
+                    stream_write = stream.write
+                    self._write_enex(notes, lambda text: stream_write(text.encode("utf-8")))
+                return raw.tell()
+                
+        with open_output_file(output_path) as file:
+            self._write_enex(notes, file.write)
+            # The text layer holds no state for UTF-8, so once flushed the binary
+            # buffer's position is the number of bytes written
+            file.flush()
+            return file.buffer.tell()
+    
+    def _write_enex(self, notes: List[Dict[str, Any]], write: Callable[[str], Any]) -> None:
+        """Write a complete ENEX document using the given write function.
+        
+        Args:
+            notes: List of note dictionaries
+            write: Function that receives each fragment of the document
         """
         # Generate export date
         export_date = self._format_date(datetime.datetime.now())
         
+        # Escape attribute values
+        application_name = _escape_xml(self.application_name).replace('"', "&quot;")
+        enex_version = _escape_xml(self.enex_version).replace('"', "&quot;")
+        
         # Start ENEX document
-        enex_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE en-export SYSTEM "http://xml.evernote.com/pub/evernote-export3.dtd">
-<en-export export-date="{export_date}" application="{self.application_name}" version="{self.enex_version}">
-"""
+        write(ENEX_HEADER_TEMPLATE.substitute(
+            export_date=export_date,
+            application_name=application_name,
+            enex_version=enex_version
+        ))
         
         # Add each note
         for note in notes:
-            enex_content += self._generate_note_xml(note)
+            self._write_note_xml(note, write)
             
         # Close ENEX document
-        enex_content += "</en-export>"
-        
-        # Save to file if path provided
-        if output_path:
-            with open(output_path, "w", encoding="utf-8") as file:
-                file.write(enex_content)
-                
-        return enex_content
+        write("</en-export>")
     
     def create_note_object(self, 
                            title: str, 
@@ -78,7 +305,7 @@ class ENEXGenerator:
                            author: Optional[str] = None,
                            tags: Optional[List[str]] = None,
                            notebook: Optional[str] = None,
-                           metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                           metadata: Optional[Dict[str, Any]] = None) -> ENEXNote:
         """Create a note object with all necessary components.
         
         Args:
@@ -94,7 +321,7 @@ class ENEXGenerator:
             metadata: Additional metadata (optional)
             
         Returns:
-            Note dictionary
+            ENEXNote instance
         """
         # Use current time if dates not provided
         if created_date is None:
@@ -107,22 +334,19 @@ class ENEXGenerator:
         tags = tags or []
         metadata = metadata or {}
         
-        # Create note object
-        note = {
-            "title": title,
-            "content": content,
-            "created": created_date,
-            "updated": updated_date,
-            "author": author,
-            "resources": resources,
-            "tags": tags,
-            "notebook": notebook,
-            "source_url": source_url,
-            "guid": str(uuid.uuid4()),
-            "metadata": metadata
-        }
-        
-        return note
+        return ENEXNote(
+            title=title,
+            content=content,
+            created=created_date,
+            updated=updated_date,
+            author=author,
+            resources=resources,
+            tags=tags,
+            notebook=notebook,
+            source_url=source_url,
+            guid=_new_guid(),
+            metadata=metadata,
+        )
     
     def extract_note_metadata(self, file_path: str, content: str) -> Dict[str, Any]:
         """Extract metadata from markdown content and file attributes.
@@ -136,121 +360,116 @@ class ENEXGenerator:
         """
         metadata = {}
         
-        # Extract file modification times
-        file_path_obj = Path(file_path)
-        if file_path_obj.exists():
-            stat = file_path_obj.stat()
+        # Extract file modification times with a single stat call
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            pass
+        else:
             metadata["file_created"] = datetime.datetime.fromtimestamp(stat.st_ctime)
             metadata["file_modified"] = datetime.datetime.fromtimestamp(stat.st_mtime)
         
+        # Find the first occurrence of each metadata line in a single scan
+        found: Dict[str, str] = {}
+        for match in METADATA_RE.finditer(content):
+            key = match.lastgroup
+            if key not in found:
+                found[key] = match.group(key)
+                if len(found) == 5:
+                    break
+        
         # Extract title from first heading or filename
-        title_match = TITLE_RE.search(content)
-        if title_match:
-            metadata["title"] = title_match.group(1).strip()
+        if "title" in found:
+            metadata["title"] = found["title"].strip()
         else:
-            metadata["title"] = file_path_obj.stem
+            metadata["title"] = os.path.splitext(os.path.basename(file_path))[0]
             
         # Extract dates
-        date_match = DATE_RE.search(content)
-        if date_match:
-            date_str = date_match.group(1).strip()
-            try:
-                metadata["date"] = self._parse_date(date_str)
-            except ValueError:
-                pass
-                
-        created_match = CREATED_RE.search(content)
-        if created_match:
-            created_str = created_match.group(1).strip()
-            try:
-                metadata["created"] = self._parse_date(created_str)
-            except ValueError:
-                pass
-                
-        updated_match = UPDATED_RE.search(content)
-        if updated_match:
-            updated_str = updated_match.group(1).strip()
-            try:
-                metadata["updated"] = self._parse_date(updated_str)
-            except ValueError:
-                pass
+        for key in ("date", "created", "updated"):
+            if key in found:
+                parsed_date = self._try_parse_date(found[key].strip())
+                if parsed_date is not None:
+                    metadata[key] = parsed_date
                 
         # Extract tags
-        tags_match = TAGS_RE.search(content)
-        if tags_match:
-            tags_str = tags_match.group(1).strip()
+        if "tags" in found:
+            tags_str = found["tags"].strip()
             tags = [tag.strip() for tag in tags_str.split(',')]
             metadata["tags"] = tags
             
         return metadata
         
-    def _generate_note_xml(self, note: Dict[str, Any]) -> str:
+    def _generate_note_xml(self, note: Any) -> str:
         """Generate XML for a single note.
         
         Args:
-            note: Note dictionary
+            note: ENEXNote, or a note dictionary
             
         Returns:
             Note XML as string
         """
-        # Format dates
-        created_date = self._format_date(note["created"])
-        updated_date = self._format_date(note["updated"])
-        
-        # Escape title
-        title = saxutils.escape(note["title"])
-        
-        # Start note element
-        note_xml = "  <note>\n"
-        
-        # Add metadata
-        note_xml += f"    <title>{title}</title>\n"
+        parts: List[str] = []
+        self._write_note_xml(note, parts.append)
+        return "".join(parts)
+    
+    def _write_note_xml(self, note: Any, write: Callable[[str], Any]) -> None:
+        """Write the XML for a single note using the given write function.
         
-        if self.add_creation_date:
-            note_xml += f"    <created>{created_date}</created>\n"
+        Args:
+            note: ENEXNote, or a note dictionary
+            write: Function that receives each fragment of the note XML
+        """
+        if not isinstance(note, ENEXNote):
+            note = ENEXNote.from_dict(note)
             
+        # Start note element with the escaped title and formatted dates; dates are
+        # only formatted when they are written
+        fields = {"title": _escape_xml(note.title)}
+        if self.add_creation_date:
+            fields["created"] = self._format_date(note.created)
         if self.add_update_date:
-            note_xml += f"    <updated>{updated_date}</updated>\n"
+            fields["updated"] = self._format_date(note.updated)
+        write(self._note_head_template.format_map(fields))
             
         # Add tags
-        for tag in note.get("tags", []):
-            tag_escaped = saxutils.escape(tag)
-            note_xml += f"    <tag>{tag_escaped}</tag>\n"
+        for tag in note.tags:
+            tag_escaped = _escape_xml(tag)
+            write(f"    <tag>{tag_escaped}</tag>\n")
             
-        # Add note attributes
-        note_xml += "    <note-attributes>\n"
-        
-        # Add author
-        author = saxutils.escape(note.get("author", self.default_author))
-        note_xml += f"      <author>{author}</author>\n"
+        # Add note attributes with the author
+        author = note.author
+        if author is None or author == self.default_author:
+            author = self._default_author_escaped
+        else:
+            author = _escape_xml(author)
+        write(f"    <note-attributes>\n      <author>{author}</author>\n")
         
         # Add source URL if available
-        if self.add_source_url and "source_url" in note and note["source_url"]:
-            source_url = saxutils.escape(note["source_url"])
-            note_xml += f"      <source-url>{source_url}</source-url>\n"
+        if self.add_source_url and note.source_url:
+            source_url = _escape_xml(note.source_url)
+            write(f"      <source-url>{source_url}</source-url>\n")
             
         # Remove source application
-        # note_xml += f"      <source-application>{self.application_name}</source-application>\n"
+        # write(f"      <source-application>{self.application_name}</source-application>\n")
         
         # Remove notebook if specified
-        # if "notebook" in note and note["notebook"]:
-        #     notebook = saxutils.escape(note["notebook"])
-        #     note_xml += f"      <notebook>{notebook}</notebook>\n"
+        # if note.notebook:
+        #     notebook = _escape_xml(note.notebook)
+        #     write(f"      <notebook>{notebook}</notebook>\n")
             
-        note_xml += "    </note-attributes>\n"
+        write("    </note-attributes>\n")
         
         # Add content directly (it should already be properly formatted with CDATA)
-        content = note['content']
-        note_xml += f"    <content>{content}</content>\n"
+        write("    <content>")
+        write(note.content)
+        write("</content>\n")
         
         # Add resources
-        for resource in note.get("resources", []):
-            note_xml += self._generate_resource_xml(resource)
+        for resource in note.resources:
+            self._write_resource_xml(resource, write)
             
         # Close note element
-        note_xml += "  </note>\n"
-        
-        return note_xml
+        write("  </note>\n")
     
     def _generate_resource_xml(self, resource: Dict[str, Any]) -> str:
         """Generate XML for a resource.
@@ -261,48 +480,66 @@ class ENEXGenerator:
         Returns:
             Resource XML as string
         """
-        mime_type = resource.get("mime", "application/octet-stream")
-        data_base64 = resource.get("data", "")
+        parts: List[str] = []
+        self._write_resource_xml(resource, parts.append)
+        return "".join(parts)
+    
+    def _write_resource_xml(self, resource: Dict[str, Any], write: Callable[[str], Any]) -> None:
+        """Write the XML for a resource using the given write function.
+        
+        Args:
+            resource: Resource dictionary
+            write: Function that receives each fragment of the resource XML
+        """
+        mime_type = _escape_xml(resource.get("mime", "application/octet-stream"))
         filename = resource.get("filename", "")
         
-        # Format base64 data with line breaks every 76 characters
-        formatted_data = ""
-        chunk_size = 120
-        for i in range(0, len(data_base64), chunk_size):
-            formatted_data += data_base64[i:i+chunk_size] + "\n"
+        write("    <resource>\n      <data encoding=\"base64\">\n")
         
-        resource_xml = "    <resource>\n"
-        resource_xml += f"      <data encoding=\"base64\">\n{formatted_data}</data>\n"
-        resource_xml += f"      <mime>{mime_type}</mime>\n"
+        # Format base64 data with a line break every 120 characters. Resources read
+        # from disk carry only their path and are encoded chunk by chunk, so the
+        # whole file is never held in memory.
+        for data_base64 in iter_resource_base64(resource):
+            self._write_base64_lines(data_base64, write)
+            
+        write(f"</data>\n      <mime>{mime_type}</mime>\n")
         
         # Add width and height if available
         if "width" in resource and "height" in resource:
-            resource_xml += f"      <width>{resource["width"]}</width>\n"
-            resource_xml += f"      <height>{resource["height"]}</height>\n"
+            write(f"      <width>{resource['width']}</width>\n")
+            write(f"      <height>{resource['height']}</height>\n")
 
         # Add resource attributes
-        has_attributes = False
-        attributes_xml = "      <resource-attributes>\n"
+        attributes = []
         
         # Add timestamp if available
         if "timestamp" in resource and isinstance(resource["timestamp"], datetime.datetime):
             timestamp_str = self._format_date(resource["timestamp"])
-            attributes_xml += f"        <timestamp>{timestamp_str}</timestamp>\n"
-            has_attributes = True
+            attributes.append(f"        <timestamp>{timestamp_str}</timestamp>\n")
 
         # Add filename if available
         if filename:
-            attributes_xml += f"        <file-name>{saxutils.escape(filename)}</file-name>\n"
-            has_attributes = True
+            attributes.append(f"        <file-name>{_escape_xml(filename)}</file-name>\n")
 
-        attributes_xml += "      </resource-attributes>\n"
-        
-        if has_attributes:
-            resource_xml += attributes_xml
+        if attributes:
+            write("      <resource-attributes>\n")
+            write("".join(attributes))
+            write("      </resource-attributes>\n")
             
-        resource_xml += "    </resource>\n"
+        write("    </resource>\n")
+    
+    @staticmethod
+    def _write_base64_lines(data_base64: str, write: Callable[[str], Any]) -> None:
+        """Write base64 data split into lines of BASE64_LINE_LENGTH characters.
         
-        return resource_xml
+        Args:
+            data_base64: Base64 encoded data
+            write: Function that receives the lines
+        """
+        if data_base64:
+            write("\n".join([data_base64[i:i + BASE64_LINE_LENGTH]
+                             for i in range(0, len(data_base64), BASE64_LINE_LENGTH)]))
+            write("\n")
     
     def _format_date(self, date: Any) -> str:
         """Format a date in Evernote's expected format.
@@ -321,7 +558,8 @@ class ENEXGenerator:
                 # If parsing fails, use current time
                 date = datetime.datetime.now()
                 
-        return date.strftime("%Y%m%dT%H%M%SZ")
+        # Equivalent to strftime("%Y%m%dT%H%M%SZ") without parsing the format string
+        return f"{date.year:04d}{date.month:02d}{date.day:02d}T{date.hour:02d}{date.minute:02d}{date.second:02d}Z"
         
     def _parse_date(self, date_str: str) -> datetime.datetime:
         """Parse a date string in various formats.
@@ -335,23 +573,34 @@ class ENEXGenerator:
         Raises:
             ValueError: If the date string cannot be parsed
         """
+        date = self._try_parse_date(date_str)
+        if date is None:
+            raise ValueError(f"Unable to parse date: {date_str}")
+        return date
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _try_parse_date(date_str: str) -> Optional[datetime.datetime]:
+        """Parse a date string in various formats.
+        
+        Results are cached by date string, since notes in a folder often share dates.
+        
+        Args:
+            date_str: Date string
+            
+        Returns:
+            Datetime object, or None if the date string cannot be parsed
+        """
+        # Plain ISO dates are the common case and parse without trying each format
+        if ISO_DATE_RE.match(date_str):
+            try:
+                return datetime.datetime.fromisoformat(date_str)
+            except ValueError:
+                # Out-of-range values such as 2023-02-30 match no format
+                pass
+                
         # Try various date formats
-        formats = [
-            "%Y-%m-%d",             # 2023-01-01
-            "%Y-%m-%d %H:%M:%S",    # 2023-01-01 12:30:45
-            "%Y-%m-%dT%H:%M:%S",    # 2023-01-01T12:30:45
-            "%Y-%m-%dT%H:%M:%SZ",   # 2023-01-01T12:30:45Z
-            "%Y%m%dT%H%M%SZ",       # 20230101T123045Z
-            "%d/%m/%Y",             # 01/01/2023
-            "%m/%d/%Y",             # 01/01/2023
-            "%b %d, %Y",            # Jan 01, 2023
-            "%d %b %Y",             # 01 Jan 2023
-            "%B %d, %Y",            # January 01, 2023
-            "%d %B %Y",             # 01 January 2023
-            "%Y/%m/%d",             # 2023/01/01
-        ]
-        
-        for fmt in formats:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.datetime.strptime(date_str, fmt)
             except ValueError:
@@ -361,9 +610,39 @@ class ENEXGenerator:
         try:
             from dateutil import parser
             return parser.parse(date_str)
-        except (ImportError, ValueError):
-            # If dateutil is not available or fails, raise error
-            raise ValueError(f"Unable to parse date: {date_str}")
+        except (ImportError, ValueError, OverflowError):
+            # If dateutil is not available or fails, the date cannot be parsed
+            return None
+
+# Generator reused across calls with the same configuration
+_generator: ConfigMemo[ENEXGenerator] = ConfigMemo(ENEXGenerator)
+
+
+def get_generator(config: Dict[str, Any]) -> ENEXGenerator:
+    """Get an ENEX generator for the given configuration.
+    
+    The generator from the previous call is reused when the configuration is
+    the same, so that the module-level helpers do not rebuild it for every note.
+    
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        ENEXGenerator instance
+    """
+    return _generator.get(config)
+
+
+def parse_date(date_str: str) -> Optional[datetime.datetime]:
+    """Parse a date string in any of the formats accepted in note metadata.
+    
+    Args:
+        date_str: Date string
+        
+    Returns:
+        Datetime object, or None if the date string cannot be parsed
+    """
+    return ENEXGenerator._try_parse_date(date_str)
 
 
 def generate_enex_file(notes: List[Dict[str, Any]], config: Dict[str, Any], output_path: Optional[str] = None) -> str:
@@ -377,10 +656,29 @@ def generate_enex_file(notes: List[Dict[str, Any]], config: Dict[str, Any], outp
     Returns:
         ENEX content as string
     """
-    generator = ENEXGenerator(config)
+    generator = get_generator(config)
     return generator.generate_enex_file(notes, output_path)
 
 
+def write_enex_file(notes: List[Dict[str, Any]], config: Dict[str, Any], output_path: str, compression: Optional[str] = None,
+                    compression_threads: int = -1) -> int:
+    """Write an ENEX file from a list of notes.
+    
+    Args:
+        notes: List of note dictionaries
+        config: Configuration dictionary
+        output_path: Path of the ENEX file
+        compression: "zstd" to write a zstd-compressed file, or None for plain XML
+        compression_threads: zstd worker threads; -1 uses one per CPU and 0
+            compresses in the calling thread
+        
+    Returns:
+        Size of the written file in bytes
+    """
+    generator = get_generator(config)
+    return generator.write_enex_file(notes, output_path, compression, compression_threads)
+
+
 def extract_note_metadata(file_path: str, content: str, config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract metadata from markdown content and file attributes.
     
@@ -392,7 +690,7 @@ def extract_note_metadata(file_path: str, content: str, config: Dict[str, Any])
     Returns:
         Metadata dictionary
     """
-    generator = ENEXGenerator(config)
+    generator = get_generator(config)
     return generator.extract_note_metadata(file_path, content)
 
 
@@ -400,7 +698,7 @@ def create_note_object(title: str,
                       content: str, 
                       resources: List[Dict[str, Any]], 
                       config: Dict[str, Any],
-                      **kwargs) -> Dict[str, Any]:
+                      **kwargs) -> ENEXNote:
     """Create a note object with all necessary components.
     
     Args:
@@ -411,7 +709,7 @@ def create_note_object(title: str,
         **kwargs: Additional arguments to pass to create_note_object
         
     Returns:
-        Note dictionary
+        ENEXNote instance
     """
-    generator = ENEXGenerator(config)
+    generator = get_generator(config)
     return generator.create_note_object(title, content, resources, **kwargs)
\ No newline at end of file
@@ -6,14 +6,68 @@ and resources into complete ENEX files according to the configured grouping rule
 """
 
 import os
+import re
 import sys
 import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Set, Tuple, Optional
+from typing import Dict, Any, List, Set, Tuple, Optional, Callable
 from collections import defaultdict
 
-from .enex_generator import generate_enex_file, create_note_object
+from .enex_generator import ZSTD_AVAILABLE, write_enex_file, create_note_object
+
+
+# Characters removed from file names: anything but letters, digits, spaces and "-_.".
+# \w covers exactly str.isalnum() plus the underscore.
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w \-.]+')
+
+
+def _top_folder_key(note_info_item: Dict[str, Any], note: Dict[str, Any]) -> str:
+    """Group name for grouping by top-level folder."""
+    relative_path = note_info_item.get("relative_path")
+    if relative_path is None:
+        parts = Path(note_info_item["file_path"]).parts
+        return parts[0] if len(parts) > 1 else "Root"
+        
+    # The scanner gives normalized relative paths, so the top folder is everything
+    # before the first separator; no need to build a Path per note
+    if os.altsep:
+        relative_path = relative_path.replace(os.altsep, os.sep)
+    top_folder, separator, _ = relative_path.partition(os.sep)
+    return top_folder if separator else "Root"
+
+
+def _full_folder_key(note_info_item: Dict[str, Any], note: Dict[str, Any]) -> str:
+    """Group name for grouping by full folder path."""
+    return note_info_item.get("folder_path", "Root")
+
+
+def _notebook_key(note_info_item: Dict[str, Any], note: Dict[str, Any]) -> str:
+    """Group name for grouping by the notebook in the note metadata."""
+    # Notes always carry a notebook field, which is None when no notebook was set
+    return note.get("notebook") or "Default"
+
+
+def _custom_key(note_info_item: Dict[str, Any], note: Dict[str, Any]) -> str:
+    """Group name for grouping by the ENEX file name from note_info, without extension."""
+    enex_filename = note_info_item.get("enex_filename", "notes.enex")
+    if enex_filename.lower().endswith(".enex"):
+        return enex_filename[:-5]
+    return enex_filename
+
+
+# Group name functions for each group_by setting other than "single"
+GROUP_KEY_FUNCTIONS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], str]] = {
+    "top_folder": _top_folder_key,
+    "full_folder": _full_folder_key,
+    "notebook": _notebook_key,
+    "custom": _custom_key,
+}
+
+
+# Units for human-readable file sizes, in steps of 1024
+SIZE_UNITS = ("B", "KB", "MB", "GB")
 
 
 class ENEXOutputError(Exception):
@@ -21,6 +75,25 @@ class ENEXOutputError(Exception):
     pass
 
 
+def _write_enex_file(notes: List[Dict[str, Any]], config: Dict[str, Any], output_path: str,
+                     compression: Optional[str] = None, compression_threads: int = -1) -> Tuple[float, int]:
+    """Write one ENEX file; module-level so it can run in a worker process.
+    
+    Args:
+        notes: Notes to write
+        config: Configuration dictionary
+        output_path: Path of the ENEX file
+        compression: Output compression ("zstd"), or None
+        compression_threads: zstd worker threads (-1 = one per CPU, 0 = none)
+        
+    Returns:
+        Tuple of (time taken in seconds, file size in bytes)
+    """
+    start_time = time.time()
+    file_size = write_enex_file(notes, config, output_path, compression, compression_threads)
+    return time.time() - start_time, file_size
+
+
 class ENEXOutput:
     """Handles the final ENEX file generation and output."""
     
@@ -36,9 +109,28 @@ class ENEXOutput:
         # Initialize options
         self.output_directory = config.get("output_directory", ".")
         self.group_by = self.output_options.get("group_by", "single")  # "single", "top_folder", "full_folder"
+        self._group_key = GROUP_KEY_FUNCTIONS.get(self.group_by)
         self.naming_pattern = self.output_options.get("naming_pattern", "{name}.enex")
         self.max_notes_per_file = self.output_options.get("max_notes_per_file", 0)  # 0 = no limit
         self.progress_reporting = self.output_options.get("progress_reporting", True)
+        self.replace_spaces = self.output_options.get("replace_spaces", True)
+        
+        # Optional zstd compression of the written files
+        compress = self.output_options.get("compress", "none")
+        if compress not in ("none", "zstd"):
+            raise ENEXOutputError(f"Unknown output compression: {compress}")
+        if compress == "zstd" and not ZSTD_AVAILABLE:
+            print("Warning: zstandard is not installed, writing uncompressed ENEX files")
+            compress = "none"
+        self.compression = compress if compress != "none" else None
+        self.parallel_workers = self.output_options.get("parallel_workers", 1)  # 1 = write files one at a time
+        
+        # Size in bytes of each file written, by output path
+        self.file_sizes: Dict[str, int] = {}
+        
+        # Filename formatting settings resolved once rather than per file
+        self._pattern_has_name = "{name}" in self.naming_pattern
+        self._filename_suffix = ".zst" if self.compression == "zstd" else ""
         
         # Create logger
         self.logger = logging.getLogger("enex_output")
@@ -73,9 +165,8 @@ class ENEXOutput:
         # Group notes
         grouped_notes = self._group_notes(notes, note_info)
         
-        # Generate ENEX files
-        output_files = {}
-        
+        # Decide which notes go to which file
+        planned_files = []
         total_groups = len(grouped_notes)
         for i, (group_name, group_notes) in enumerate(grouped_notes.items(), 1):
             if self.progress_reporting:
@@ -83,29 +174,14 @@ class ENEXOutput:
             
             # Apply note limit if configured
             if self.max_notes_per_file > 0 and len(group_notes) > self.max_notes_per_file:
-                output_files.update(self._split_large_group(group_name, group_notes, output_dir))
+                planned_files.extend(self._split_large_group(group_name, group_notes, output_dir))
             else:
                 # Generate a single file for this group
-                filename = self._format_filename(group_name)
-                output_path = output_dir / filename
-                
-                if self.progress_reporting:
-                    self.logger.info(f"Writing {len(group_notes)} notes to {output_path}")
-                
-                try:
-                    start_time = time.time()
-                    generate_enex_file(group_notes, self.config, str(output_path))
-                    end_time = time.time()
-                    
-                    if self.progress_reporting:
-                        file_size = output_path.stat().st_size
-                        self.logger.info(f"Created {filename} ({self._format_size(file_size)}) in {end_time - start_time:.2f} seconds")
-                    
-                    output_files[group_name] = str(output_path)
-                except Exception as e:
-                    error_msg = f"Error generating ENEX file {filename}: {str(e)}"
-                    self.logger.error(error_msg)
-                    raise ENEXOutputError(error_msg) from e
+                output_path = output_dir / self._format_filename(group_name)
+                planned_files.append((group_name, group_notes, output_path))
+        
+        # Generate ENEX files
+        output_files = self._write_files(planned_files)
         
         if self.progress_reporting:
             self.logger.info(f"Successfully generated {len(output_files)} ENEX files")
@@ -129,60 +205,12 @@ class ENEXOutput:
             grouped_notes["All Notes"] = notes
             return grouped_notes
         
-        # Create a mapping from file paths to note objects
-        note_map = {}
-        for i, note_info_item in enumerate(note_info):
-            if i < len(notes):
-                note_map[note_info_item["file_path"]] = notes[i]
-        
-        # Group by top-level folder
-        if self.group_by == "top_folder":
-            for note_info_item in note_info:
-                file_path = note_info_item["file_path"]
-                if file_path in note_map:
-                    # Get top-level folder
-                    relative_path = note_info_item.get("relative_path", file_path)
-                    parts = Path(relative_path).parts
-                    
-                    if len(parts) > 1:
-                        group_name = parts[0]
-                    else:
-                        group_name = "Root"
-                    
-                    grouped_notes[group_name].append(note_map[file_path])
-        
-        # Group by full folder path
-        elif self.group_by == "full_folder":
-            for note_info_item in note_info:
-                file_path = note_info_item["file_path"]
-                if file_path in note_map:
-                    # Use folder path
-                    folder_path = note_info_item.get("folder_path", "Root")
-                    grouped_notes[folder_path].append(note_map[file_path])
-        
-        # Group by notebook (if specified in note metadata)
-        elif self.group_by == "notebook":
-            for note_info_item in note_info:
-                file_path = note_info_item["file_path"]
-                if file_path in note_map:
-                    note = note_map[file_path]
-                    notebook = note.get("notebook", "Default")
-                    grouped_notes[notebook].append(note)
-        
-        # Group by custom (use enex_filename from note_info)
-        elif self.group_by == "custom":
-            for note_info_item in note_info:
-                file_path = note_info_item["file_path"]
-                if file_path in note_map:
-                    # Use custom filename from note_info
-                    enex_filename = note_info_item.get("enex_filename", "notes.enex")
-                    # Remove .enex extension for group name
-                    if enex_filename.lower().endswith(".enex"):
-                        group_name = enex_filename[:-5]
-                    else:
-                        group_name = enex_filename
-                    
-                    grouped_notes[group_name].append(note_map[file_path])
+        # note_info and notes are parallel lists, so pair them up directly; the
+        # group name function was chosen once from group_by in __init__
+        group_key = self._group_key
+        if group_key is not None:
+            for note_info_item, note in zip(note_info, notes):
+                grouped_notes[group_key(note_info_item, note)].append(note)
         
         # If no grouping was done (e.g., invalid group_by), default to single file
         if not grouped_notes:
@@ -190,7 +218,7 @@ class ENEXOutput:
         
         return grouped_notes
     
-    def _split_large_group(self, group_name: str, notes: List[Dict[str, Any]], output_dir: Path) -> Dict[str, str]:
+    def _split_large_group(self, group_name: str, notes: List[Dict[str, Any]], output_dir: Path) -> List[Tuple[str, List[Dict[str, Any]], Path]]:
         """Split a large group of notes into multiple files.
         
         Args:
@@ -199,9 +227,9 @@ class ENEXOutput:
             output_dir: Output directory
             
         Returns:
-            Dictionary mapping group names to output paths
+            List of (part name, notes, output path) tuples, one per file
         """
-        output_files = {}
+        planned_files = []
         chunk_size = self.max_notes_per_file
         
         # Calculate number of chunks
@@ -217,26 +245,92 @@ class ENEXOutput:
             if self.progress_reporting:
                 self.logger.info(f"Generating part {i+1}/{num_chunks} for {group_name} with {len(chunk_notes)} notes")
             
-            filename = self._format_filename(chunk_name)
-            output_path = output_dir / filename
+            output_path = output_dir / self._format_filename(chunk_name)
+            planned_files.append((chunk_name, chunk_notes, output_path))
+        
+        return planned_files
+    
+    def _write_files(self, planned_files: List[Tuple[str, List[Dict[str, Any]], Path]]) -> Dict[str, str]:
+        """Write the planned ENEX files.
+        
+        With parallel_workers above 1 and more than one file, the files are
+        written by a pool of worker processes; results are still reported in
+        the planned order.
+        
+        Args:
+            planned_files: List of (group name, notes, output path) tuples
+            
+        Returns:
+            Dictionary mapping group names to output paths
             
-            try:
-                start_time = time.time()
-                generate_enex_file(chunk_notes, self.config, str(output_path))
-                end_time = time.time()
-                
+        Raises:
+            ENEXOutputError: If a file could not be written
+        """
+        output_files = {}
+        workers = min(self.parallel_workers or 1, len(planned_files))
+        
+        # Groups whose names sanitize to the same file name must not be written
+        # concurrently; fall back to writing one file at a time
+        if workers > 1 and len({output_path for _, _, output_path in planned_files}) < len(planned_files):
+            workers = 1
+        
+        if workers <= 1:
+            for group_name, group_notes, output_path in planned_files:
+                if self.progress_reporting:
+                    self.logger.info(f"Writing {len(group_notes)} notes to {output_path}")
+                try:
+                    elapsed, file_size = _write_enex_file(group_notes, self.config, str(output_path), self.compression)
+                except Exception as e:
+                    raise self._write_error(output_path, e) from e
+                self._report_written(output_path, elapsed, file_size)
+                output_files[group_name] = str(output_path)
+                self.file_sizes[str(output_path)] = file_size
+            return output_files
+            
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for group_name, group_notes, output_path in planned_files:
                 if self.progress_reporting:
-                    file_size = output_path.stat().st_size
-                    self.logger.info(f"Created {filename} ({self._format_size(file_size)}) in {end_time - start_time:.2f} seconds")
+                    self.logger.info(f"Writing {len(group_notes)} notes to {output_path}")
+                # Each worker compresses in its own thread; the pool already uses the cores
+                futures.append(executor.submit(_write_enex_file, group_notes, self.config, str(output_path),
+                                               self.compression, 0))
                 
-                output_files[chunk_name] = str(output_path)
-            except Exception as e:
-                error_msg = f"Error generating ENEX file {filename}: {str(e)}"
-                self.logger.error(error_msg)
-                raise ENEXOutputError(error_msg) from e
-        
+            for (group_name, _, output_path), future in zip(planned_files, futures):
+                try:
+                    elapsed, file_size = future.result()
+                except Exception as e:
+                    raise self._write_error(output_path, e) from e
+                self._report_written(output_path, elapsed, file_size)
+                output_files[group_name] = str(output_path)
+                self.file_sizes[str(output_path)] = file_size
         return output_files
     
+    def _report_written(self, output_path: Path, elapsed: float, file_size: int) -> None:
+        """Log a successfully written ENEX file.
+        
+        Args:
+            output_path: Path of the ENEX file
+            elapsed: Time taken to write it in seconds
+            file_size: Size of the file in bytes
+        """
+        if self.progress_reporting:
+            self.logger.info(f"Created {output_path.name} ({self._format_size(file_size)}) in {elapsed:.2f} seconds")
+    
+    def _write_error(self, output_path: Path, error: Exception) -> ENEXOutputError:
+        """Log a failed ENEX file write and build the error to raise.
+        
+        Args:
+            output_path: Path of the ENEX file
+            error: Exception raised while writing it
+            
+        Returns:
+            ENEXOutputError describing the failure
+        """
+        error_msg = f"Error generating ENEX file {output_path.name}: {str(error)}"
+        self.logger.error(error_msg)
+        return ENEXOutputError(error_msg)
+    
     def _format_filename(self, name: str) -> str:
         """Format a filename according to the naming pattern.
         
@@ -247,22 +341,22 @@ class ENEXOutput:
             Formatted filename
         """
         # Remove invalid characters from filename
-        safe_name = "".join(c for c in name if c.isalnum() or c in " -_.")
-        safe_name = safe_name.strip()
+        safe_name = UNSAFE_FILENAME_CHARS_RE.sub("", name).strip()
         
         # Replace spaces with underscores if they remain
-        if self.output_options.get("replace_spaces", True):
+        if self.replace_spaces:
             safe_name = safe_name.replace(" ", "_")
         
         # Add .enex extension if not in the pattern
-        if "{name}" in self.naming_pattern:
+        if self._pattern_has_name:
             filename = self.naming_pattern.format(name=safe_name)
             if not filename.lower().endswith(".enex"):
                 filename += ".enex"
         else:
             filename = f"{safe_name}.enex"
-        
-        return filename
+            
+        # Compressed files keep the .enex name with the compression suffix
+        return filename + self._filename_suffix
     
     def _format_size(self, size_bytes: int) -> str:
         """Format a file size in a human-readable format.
@@ -273,29 +367,36 @@ class ENEXOutput:
         Returns:
             Formatted size string
         """
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size_bytes < 1024 or unit == "GB":
-                break
-            size_bytes /= 1024
+        # Each unit is 10 bits more than the previous one, so the bit length of the
+        # size picks the unit directly
+        unit_index = 0
+        if size_bytes >= 1024:
+            unit_index = min((int(size_bytes).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
         
-        return f"{size_bytes:.1f} {unit}"
+        return f"{size_bytes / (1 << (10 * unit_index)):.1f} {SIZE_UNITS[unit_index]}"
 
 
 def generate_output(notes: List[Dict[str, Any]], 
                    note_info: List[Dict[str, Any]], 
-                   config: Dict[str, Any]) -> Dict[str, str]:
+                   config: Dict[str, Any],
+                   file_sizes: Optional[Dict[str, int]] = None) -> Dict[str, str]:
     """Generate ENEX output files.
     
     Args:
         notes: List of note objects
         note_info: List of note info objects from scanner
         config: Configuration dictionary
+        file_sizes: Optional dictionary to fill with the size in bytes of each
+            written file, by output path
         
     Returns:
         Dictionary mapping group names to output paths
     """
     output_handler = ENEXOutput(config)
-    return output_handler.generate(notes, note_info)
+    output_files = output_handler.generate(notes, note_info)
+    if file_sizes is not None:
+        file_sizes.update(output_handler.file_sizes)
+    return output_files
 
 
 def get_best_group_by(folder_structure: Dict[str, Any]) -> str:
@@ -317,11 +418,11 @@ def get_best_group_by(folder_structure: Dict[str, Any]) -> str:
     if total_notes < 10:
         return "single"
     
-    # Count top-level folders
-    top_folders = []
-    for key, value in folder_structure.items():
-        if key != "total_notes" and key != "total_resources" and isinstance(value, dict):
-            top_folders.append(key)
+    # Collect top-level folders in a single pass
+    top_folders = [
+        key for key, value in folder_structure.items()
+        if key != "total_notes" and key != "total_resources" and isinstance(value, dict)
+    ]
     
     # If there are multiple top-level folders, group by top folder
     if len(top_folders) > 1:
@@ -329,16 +430,12 @@ def get_best_group_by(folder_structure: Dict[str, Any]) -> str:
     
     # If there's just one top folder but it has subfolders, try full path
     if len(top_folders) == 1:
-        top_folder = top_folders[0]
-        if isinstance(folder_structure[top_folder], dict):
-            has_subfolders = False
-            for key, value in folder_structure[top_folder].items():
-                if key != "notes" and key != "resources" and isinstance(value, dict):
-                    has_subfolders = True
-                    break
-            
-            if has_subfolders:
-                return "full_folder"
+        has_subfolders = any(
+            key != "notes" and key != "resources" and isinstance(value, dict)
+            for key, value in folder_structure[top_folders[0]].items()
+        )
+        if has_subfolders:
+            return "full_folder"
     
     # Default to single file
     return "single"
\ No newline at end of file
@@ -1,9 +1,8 @@
+import os
 import re
-import hashlib
-import base64
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Set, Tuple, Optional, NamedTuple, TYPE_CHECKING
-from xml.sax.saxutils import escape
 import html
 
 try:
@@ -12,10 +11,88 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
     
+from .cache import get_cache, make_cache_key
+from .config import ConfigMemo
+from .resource_handler import hash_resource_file
+
 # Avoid circular imports
 if TYPE_CHECKING:
     from .markdown_processor import ImageRef
 
+# Start and end of every note's content: a CDATA section holding the ENML document
+# (with a linebreak after the XML declaration)
+ENML_PROLOGUE = (
+    '<![CDATA[<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+    '<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd"><en-note>'
+)
+ENML_EPILOGUE = '</en-note>]]>'
+
+# Patterns used when cleaning HTML
+DOCTYPE_RE = re.compile(r'<!DOCTYPE[^>]*>')
+HTML_BODY_TAG_RE = re.compile(r'<html[^>]*>|</html>|<body[^>]*>|</body>')
+UNCLOSED_TAG_RE = re.compile(r'<(img|br|hr)([^>]*)(?<!\/)>')
+ATTRIBUTE_RE = re.compile(r'([a-zA-Z0-9_-]+)=["\'](.*?)["\']')
+MALFORMED_TAG_RE = re.compile(r'<(?!/)([a-z0-9]+)(?:\s+[^>]*)?(?<![/\"])>')
+
+# Patterns used when converting images to en-media tags
+IMAGE_MARKER_RE = re.compile(r'<en-media-marker id="([^"]+)"></en-media-marker>')
+IMG_TAG_RE = re.compile(r'<img\s+src=["\'](.*?)["\'](.*?)/?>')
+IMG_ALT_RE = re.compile(r'alt=["\"](.*?)["\"]')
+HR_TAG_RE = re.compile(r'<hr[^>]*/?>')
+
+# Patterns used when converting to Evernote's formatting
+PARAGRAPH_RE = re.compile(r'<p>(.*?)</p>', re.DOTALL)
+ATTRIBUTED_PARAGRAPH_RE = re.compile(r'<p\s')
+LONE_MEDIA_DIV_RE = re.compile(r'<div>\s*(<en-media[^>]+/>)\s*</div>')
+DIV_RE = re.compile(r'<div>(.*?)</div>', re.DOTALL)
+URL_RE = re.compile(r'(?<!["\'=])(https?://[^\s<>"\']+)')
+METADATA_BLOCK_RE = re.compile(r'<div>-{3,}</div>.*?<div>-{3,}</div>', re.DOTALL)
+EMPTY_DIV_RE = re.compile(r'<div>\s*</div>')
+LANG_ATTRIBUTE_RE = re.compile(r'<([a-z0-9]+) lang=')
+WHITESPACE_BETWEEN_TAGS_RE = re.compile(r'>\s+<', re.DOTALL)
+SCRIPT_RE = re.compile(r'<script>(.*?)</script>', re.DOTALL)
+
+
+def _alt_from_path(path: str) -> str:
+    """Derive default alt text from an image path (file stem with spaces for underscores).
+    
+    Args:
+        path: Image path or URL
+        
+    Returns:
+        Alt text
+    """
+    return os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+
+
+def _find_resource_file(source_dir: str, resource_ref: str) -> Optional[Path]:
+    """Find the full path for a resource reference.
+    
+    Args:
+        source_dir: Source directory of the notes, or "" if not set
+        resource_ref: Resource reference (filename or path)
+        
+    Returns:
+        Full path to the resource or None if not found
+    """
+    # First try the source directory (absolute references replace it)
+    if source_dir:
+        resource_path = Path(source_dir) / resource_ref
+        if resource_path.exists():
+            return resource_path
+            
+    # Check if it's a direct path
+    direct_path = Path(resource_ref)
+    if direct_path.exists():
+        return direct_path
+        
+    # Check if it's relative to current directory
+    current_path = Path.cwd() / resource_ref
+    if current_path.exists():
+        return current_path
+        
+    return None
+
 
 class ENMLProcessor:
     """Processes HTML content to make it compatible with ENEX/ENML format."""
@@ -51,6 +128,41 @@ class ENMLProcessor:
         'mouseup', 'reset', 'resize', 'scroll', 'select', 'submit', 'unload'
     ]})
     
+    # MIME types by lowercase file extension
+    MIME_TYPES = {
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.bmp': 'image/bmp',
+        '.webp': 'image/webp',
+        '.svg': 'image/svg+xml',
+        '.pdf': 'application/pdf',
+        '.doc': 'application/msword',
+        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        '.xls': 'application/vnd.ms-excel',
+        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        '.ppt': 'application/vnd.ms-powerpoint',
+        '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        '.mp3': 'audio/mpeg',
+        '.mp4': 'video/mp4',
+        '.wav': 'audio/wav',
+        '.ogg': 'audio/ogg',
+        '.txt': 'text/plain',
+        '.zip': 'application/zip',
+        '.html': 'text/html',
+        '.csv': 'text/csv'
+    }
+    
+    # Removal patterns matching any prohibited element or attribute in one pass.
+    # Longer names come first so e.g. "frameset" is not matched as "frame".
+    _PROHIBITED_ELEMENT_NAMES = '|'.join(sorted(PROHIBITED_ELEMENTS, key=lambda name: (-len(name), name)))
+    PROHIBITED_ELEMENT_PAIR_RE = re.compile(f'<({_PROHIBITED_ELEMENT_NAMES})[^>]*>.*?</\\1>', re.DOTALL)
+    PROHIBITED_ELEMENT_SINGLE_RE = re.compile(f'<(?:{_PROHIBITED_ELEMENT_NAMES})[^>]*/?>')
+    PROHIBITED_ATTRIBUTE_RE = re.compile(
+        f' (?:{"|".join(sorted(PROHIBITED_ATTRIBUTES))})=["\'"][^\'"]*["\']'
+    )
+    
     def __init__(self, config: Dict[str, Any], image_registry: Optional[List[Any]] = None):
         """Initialize the ENML processor.
         
@@ -61,13 +173,23 @@ class ENMLProcessor:
         self.config = config
         
         # Get base source directory for resolving resource paths
-        self.source_dir = config.get("source_directory", "")
+        self.source_dir = config.get("source_directory") or ""
         if self.source_dir:
             self.source_dir = Path(self.source_dir)
             
         self.resource_map: Dict[str, Dict[str, Any]] = {}
+        # Resource paths already found, by the absolute paths probed for them. Notes
+        # in the same vault tend to reference the same resources, and each probe is
+        # a stat call; failed lookups are not kept, so a file added later is found
+        self._resource_paths: Dict[Tuple[str, str], Path] = {}
+        # Resource info by file name, for references that only match by basename
+        self._resource_by_basename: Dict[str, Dict[str, Any]] = {}
         self.enml_options = config.get("enml_options", {})
         self.image_registry = image_registry or []
+        self.cache = get_cache(config)
+        
+        # Hashing resources and reading image headers is I/O bound, so it can use threads
+        self.resource_threads = config.get("resource_options", {}).get("resource_threads", 1)
         
     def process_html_to_enml(self, html_content: str, resource_refs: Set[str]) -> Tuple[str, List[Dict[str, Any]]]:
         """Convert HTML content to ENML format suitable for Evernote.
@@ -82,6 +204,15 @@ class ENMLProcessor:
         # Process resources
         self._prepare_resources(resource_refs)
 
+        # Reuse the ENML from a previous run if neither the HTML nor any of the
+        # referenced resources have changed
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._get_cache_key(html_content)
+            enml_content = self.cache.get("enml", cache_key)
+            if enml_content is not None:
+                return enml_content, list(self.resource_map.values())
+
         # Step 1: Replace image & marker references BEFORE cleaning so IDs are retained
         processed_html = self._process_image_references(html_content)
 
@@ -94,13 +225,44 @@ class ENMLProcessor:
         # Step 3: Convert to Evernote-style formatting
         processed_html = self._convert_to_evernote_format(processed_html)
         
-        # Wrap in en-note with CDATA and inner XML declaration (with linebreak after XML declaration)
-        inner_xml = f'<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd"><en-note>{processed_html}</en-note>'
-        enml_content = f'<![CDATA[{inner_xml}]]>'
+        # A literal "]]>" (e.g. from raw HTML) would end the CDATA section early, so split
+        # it across two CDATA sections instead
+        if ']]>' in processed_html:
+            processed_html = processed_html.replace(']]>', ']]]]><![CDATA[>')
+        
+        # Wrap in en-note with CDATA and inner XML declaration, building the whole
+        # string in one go
+        enml_content = f'{ENML_PROLOGUE}{processed_html}{ENML_EPILOGUE}'
+        
+        if cache_key is not None:
+            self.cache.set("enml", cache_key, enml_content)
         
         # Return ENML content and resources
         return enml_content, list(self.resource_map.values())
     
+    def _get_cache_key(self, html_content: str) -> str:
+        """Build the cache key for the ENML generated from the given HTML.
+        
+        The key covers everything the ENML depends on: the HTML itself, the image
+        registry, the ENML options and the hash and dimensions of each resource.
+        
+        Args:
+            html_content: HTML content to process
+            
+        Returns:
+            Cache key string
+        """
+        resource_fingerprints = sorted(
+            (ref, info['hash'], info['mime'], info.get('width'), info.get('height'))
+            for ref, info in self.resource_map.items()
+        )
+        return make_cache_key(
+            html_content,
+            [list(img_ref) for img_ref in self.image_registry],
+            self.enml_options,
+            resource_fingerprints
+        )
+    
     def _prepare_resources(self, resource_refs: Set[str]) -> None:
         """Prepare resources for inclusion in ENEX.
         
@@ -109,49 +271,62 @@ class ENMLProcessor:
         """
         self.resource_map = {}
         
-        for resource_ref in resource_refs:
-            # Find the resource file
-            resource_path = self._find_resource_path(resource_ref)
-            
-            if not resource_path or not resource_path.exists():
-                print(f"Warning: Resource not found: {resource_ref}")
-                continue
-                
-            try:
-                # Read resource data
-                with open(resource_path, 'rb') as f:
-                    data = f.read()
-                    
-                # Calculate MD5 hash
-                md5_hash = hashlib.md5(data).hexdigest()
-                
-                # Determine MIME type
-                mime_type = self._get_mime_type(resource_path)
-                
-                # Convert to base64
-                data_base64 = base64.b64encode(data).decode('utf-8')
-                
-                # Store resource info
-                resource_info = {
-                    'data': data_base64,
-                    'mime': mime_type,
-                    'hash': md5_hash,
-                    'filename': resource_path.name
-                }
-                
-                # Get dimensions if it's an image
-                if mime_type.startswith('image/'):
-                    dimensions = self._get_image_dimensions(resource_path)
-                    if dimensions:
-                        width, height = dimensions
-                        resource_info['width'] = width
-                        resource_info['height'] = height
-                
-                # Store in resource map
+        if self.resource_threads > 1 and len(resource_refs) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.resource_threads, len(resource_refs))) as executor:
+                results = list(executor.map(self._load_resource_info, resource_refs))
+        else:
+            results = [self._load_resource_info(resource_ref) for resource_ref in resource_refs]
+        
+        self._resource_by_basename = {}
+        for resource_ref, resource_info in zip(resource_refs, results):
+            if resource_info is not None:
                 self.resource_map[resource_ref] = resource_info
-                
-            except Exception as e:
-                print(f"Error processing resource {resource_ref}: {e}")
+                self._resource_by_basename.setdefault(os.path.basename(resource_ref), resource_info)
+    
+    def _load_resource_info(self, resource_ref: str) -> Optional[Dict[str, Any]]:
+        """Find a resource file and collect its hash, MIME type and dimensions.
+        
+        Args:
+            resource_ref: Resource reference (filename or path)
+            
+        Returns:
+            Resource info dictionary or None if the resource cannot be used
+        """
+        # Find the resource file
+        resource_path = self._find_resource_path(resource_ref)
+        
+        if resource_path is None:
+            print(f"Warning: Resource not found: {resource_ref}")
+            return None
+            
+        try:
+            # Calculate MD5 hash; the resource data itself is not needed for ENML
+            md5_hash = hash_resource_file(resource_path, self.cache)
+            
+            # Determine MIME type
+            mime_type = self._get_mime_type(resource_path)
+            
+            # Store resource info
+            resource_info = {
+                'path': str(resource_path),
+                'mime': mime_type,
+                'hash': md5_hash,
+                'filename': resource_path.name
+            }
+            
+            # Get dimensions if it's an image
+            if mime_type.startswith('image/'):
+                dimensions = self._get_image_dimensions(resource_path)
+                if dimensions:
+                    width, height = dimensions
+                    resource_info['width'] = width
+                    resource_info['height'] = height
+            
+            return resource_info
+            
+        except Exception as e:
+            print(f"Error processing resource {resource_ref}: {e}")
+            return None
     
     def _find_resource_path(self, resource_ref: str) -> Optional[Path]:
         """Find the full path for a resource reference.
@@ -162,29 +337,16 @@ class ENMLProcessor:
         Returns:
             Full path to the resource or None if not found
         """
-        # First try direct path
-        if self.source_dir:
-            # Look directly in source directory for the resource
-            resource_path = self.source_dir / resource_ref
-            if resource_path.exists():
-                return resource_path
-                
-            # Look in source dir (for absolute paths)
-            resource_path = self.source_dir / resource_ref
-            if resource_path.exists():
-                return resource_path
-                
-        # Check if it's a direct path
-        direct_path = Path(resource_ref)
-        if direct_path.exists():
-            return direct_path
-            
-        # Check if it's relative to current directory
-        current_path = Path.cwd() / resource_ref
-        if current_path.exists():
-            return current_path
-            
-        return None
+        key = (
+            os.path.abspath(os.path.join(self.source_dir, resource_ref)) if self.source_dir else "",
+            os.path.abspath(resource_ref)
+        )
+        resource_path = self._resource_paths.get(key)
+        if resource_path is None:
+            resource_path = _find_resource_file(str(self.source_dir), resource_ref)
+            if resource_path is not None:
+                self._resource_paths[key] = resource_path
+        return resource_path
     
     def _get_image_dimensions(self, file_path: Path) -> Optional[Tuple[int, int]]:
         """Get image dimensions using PIL.
@@ -215,34 +377,7 @@ class ENMLProcessor:
         Returns:
             MIME type string
         """
-        extension = file_path.suffix.lower()
-        
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.webp': 'image/webp',
-            '.svg': 'image/svg+xml',
-            '.pdf': 'application/pdf',
-            '.doc': 'application/msword',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.xls': 'application/vnd.ms-excel',
-            '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            '.ppt': 'application/vnd.ms-powerpoint',
-            '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-            '.mp3': 'audio/mpeg',
-            '.mp4': 'video/mp4',
-            '.wav': 'audio/wav',
-            '.ogg': 'audio/ogg',
-            '.txt': 'text/plain',
-            '.zip': 'application/zip',
-            '.html': 'text/html',
-            '.csv': 'text/csv'
-        }
-        
-        return mime_types.get(extension, 'application/octet-stream')
+        return self.MIME_TYPES.get(file_path.suffix.lower(), 'application/octet-stream')
     
     def _clean_html(self, html_content: str) -> str:
         """Clean HTML content to be ENML-compatible.
@@ -258,19 +393,20 @@ class ENMLProcessor:
         
         result = html_content
         
-        # Remove doctype
-        result = re.sub(r'<!DOCTYPE[^>]*>', '', result)
+        # Remove doctype and html and body tags. Converted markdown rarely has them,
+        # and a substring check is much cheaper than a regex scan that finds nothing
+        if '<!DOCTYPE' in result:
+            result = DOCTYPE_RE.sub('', result)
         
-        # Remove html and body tags
-        result = re.sub(r'<html[^>]*>|</html>|<body[^>]*>|</body>', '', result)
+        if 'html' in result or 'body' in result:
+            result = HTML_BODY_TAG_RE.sub('', result)
         
-        # Remove prohibited elements with their content
-        for element in self.PROHIBITED_ELEMENTS:
-            result = re.sub(f'<{element}[^>]*>.*?</{element}>', '', result, flags=re.DOTALL)
-            result = re.sub(f'<{element}[^>]*/?>', '', result)
+        # Remove prohibited elements with their content, then any left without a closing tag
+        result = self.PROHIBITED_ELEMENT_PAIR_RE.sub('', result)
+        result = self.PROHIBITED_ELEMENT_SINGLE_RE.sub('', result)
         
         # Fix unclosed tags (img, br, hr)
-        result = re.sub(r'<(img|br|hr)([^>]*)(?<!\/)>', r'<\1\2/>', result)
+        result = UNCLOSED_TAG_RE.sub(r'<\1\2/>', result)
         
         # Fix quotes in attribute values
         def fix_quotes(match):
@@ -279,14 +415,13 @@ class ENMLProcessor:
             attr_value = attr_value.replace("'", "&apos;")
             return f'{match.group(1)}="{attr_value}"'
             
-        result = re.sub(r'([a-zA-Z0-9_-]+)=["\'](.*?)["\']', fix_quotes, result)
+        result = ATTRIBUTE_RE.sub(fix_quotes, result)
         
         # Remove prohibited attributes
-        for attr in self.PROHIBITED_ATTRIBUTES:
-            result = re.sub(f' {attr}=["\'"][^\'"]*["\']', '', result)
+        result = self.PROHIBITED_ATTRIBUTE_RE.sub('', result)
         
         # Fix any malformed tags
-        result = re.sub(r'<(?!/)([a-z0-9]+)(?:\s+[^>]*)?(?<![/\"])>', r'<\1>', result)
+        result = MALFORMED_TAG_RE.sub(r'<\1>', result)
         
         # Ensure proper entity encoding for special characters
         result = result.replace('&nbsp;', '&#160;')
@@ -314,7 +449,7 @@ class ENMLProcessor:
                     
                     if resource_info:
                         # Determine alt text (use provided alt or derive from filename)
-                        alt_text = img_ref.alt_text.strip() if img_ref.alt_text.strip() else Path(img_ref.path).stem.replace('_', ' ')
+                        alt_text = img_ref.alt_text.strip() if img_ref.alt_text.strip() else _alt_from_path(img_ref.path)
 
                         if 'width' in resource_info and 'height' in resource_info:
                             width = resource_info['width']
@@ -338,7 +473,7 @@ class ENMLProcessor:
             return f'<div>[Unknown image marker: {marker_id}]</div>'
         
         # Replace markers with en-media tags
-        result = re.sub(r'<en-media-marker id="([^"]+)"></en-media-marker>', replace_marker, html_content)
+        result = IMAGE_MARKER_RE.sub(replace_marker, html_content)
         
         # Then handle any remaining standard img tags (fallback)
         def replace_img(match):
@@ -354,8 +489,8 @@ class ENMLProcessor:
             
             if resource_info and 'width' in resource_info and 'height' in resource_info:
                 # Extract alt attribute
-                alt_match = re.search(r'alt=["\"](.*?)["\"]', attrs)
-                alt = alt_match.group(1) if alt_match else Path(src).stem.replace('_', ' ')
+                alt_match = IMG_ALT_RE.search(attrs)
+                alt = alt_match.group(1) if alt_match else _alt_from_path(src)
                 
                 # Use dimensions from resource info
                 width = resource_info['width']
@@ -369,8 +504,8 @@ class ENMLProcessor:
                 )
             elif resource_info:
                 # Embed without explicit size attributes when dimensions missing
-                alt_match = re.search(r'alt=["\"](.*?)["\"]', attrs)
-                alt = alt_match.group(1).strip() if alt_match and alt_match.group(1).strip() else Path(src).stem.replace('_', ' ')
+                alt_match = IMG_ALT_RE.search(attrs)
+                alt = alt_match.group(1).strip() if alt_match and alt_match.group(1).strip() else _alt_from_path(src)
 
                 return (
                     f'<en-media alt="{alt}" '
@@ -381,7 +516,7 @@ class ENMLProcessor:
                 return f'<div>[Image not found: {html.escape(src)}]</div>'
                 
         # Replace img tags
-        result = re.sub(r'<img\s+src=["\'](.*?)["\'](.*?)/?>', replace_img, result)
+        result = IMG_TAG_RE.sub(replace_img, result)
         
         return result
         
@@ -399,12 +534,7 @@ class ENMLProcessor:
             return self.resource_map[path]
             
         # Try by basename
-        basename = Path(path).name
-        for ref, info in self.resource_map.items():
-            if Path(ref).name == basename:
-                return info
-                
-        return None
+        return self._resource_by_basename.get(os.path.basename(path))
     
     def _replace_horizontal_rules(self, html_content: str) -> str:
         """Replace horizontal rule elements with text-based separators for Apple Notes compatibility.
@@ -415,15 +545,12 @@ class ENMLProcessor:
         Returns:
             HTML with hr elements replaced by text-based separators
         """
-        import re
-
         # Create a text-based horizontal line using em dashes
         horizontal_line = '<div style="text-align: center; margin: 10px 0;">—————————————————</div>'
 
         # Replace all forms of hr tags with the text-based separator
         # Match <hr>, <hr/>, <hr /> with any attributes
-        hr_pattern = r'<hr[^>]*/?>'
-        result = re.sub(hr_pattern, horizontal_line, html_content)
+        result = HR_TAG_RE.sub(horizontal_line, html_content)
 
         return result
 
@@ -447,11 +574,16 @@ class ENMLProcessor:
         result = result.replace('<li>', '<!--PRESERVE-LI-->')
         result = result.replace('</li>', '<!--PRESERVE-LI-END-->')
         
-        # 1. Convert paragraph tags to div tags (but keep list items as-is)
-        result = re.sub(r'<p>(.*?)</p>', r'<div>\1</div>', result, flags=re.DOTALL)
+        # 1. Convert paragraph tags to div tags (but keep list items as-is). Paragraphs
+        #    never nest, so unless some <p> has attributes (and keeps its </p>) the
+        #    tags can be renamed without pairing them up
+        if ATTRIBUTED_PARAGRAPH_RE.search(result):
+            result = PARAGRAPH_RE.sub(r'<div>\1</div>', result)
+        else:
+            result = result.replace('<p>', '<div>').replace('</p>', '</div>')
 
         # 1a. Remove wrapping divs around lone en-media tags so that the media tag is not inside a div
-        result = re.sub(r'<div>\s*(<en-media[^>]+/>)\s*</div>', r'\1', result)
+        result = LONE_MEDIA_DIV_RE.sub(r'\1', result)
 
         # 1b. Split multiline <div> blocks so that each individual line is wrapped in its own <div>
         #     (except for lines that already represent en-media tags). Blank lines become <div><br/></div>.
@@ -481,7 +613,7 @@ class ENMLProcessor:
             return ''.join(segments)
 
         # Apply the splitting – DOTALL so that inner contents can include newlines
-        result = re.sub(r'<div>(.*?)</div>', _split_multiline_div, result, flags=re.DOTALL)
+        result = DIV_RE.sub(_split_multiline_div, result)
         
         # Restore the original list tags
         result = result.replace('<!--PRESERVE-UL-->', '<ul>')
@@ -501,9 +633,10 @@ class ENMLProcessor:
                 return url
             return f'<a href="{url}" rev="en_rl_none">{url}</a>'
             
-        # Match URLs not already in a link
-        url_pattern = r'(?<!["\'=])(https?://[^\s<>"\']+)'
-        result = re.sub(url_pattern, url_to_link, result)
+        # Match URLs not already in a link; most notes have none, so check for the
+        # scheme separator before scanning with the regex
+        if '://' in result:
+            result = URL_RE.sub(url_to_link, result)
         
         # 3. Add proper <br/> spacing between content blocks
         # Add <div><br/></div> after each </div> if not followed by another tag
@@ -514,18 +647,20 @@ class ENMLProcessor:
         # # Look for markdown style images: ![[path/to/image.jpg]]\n        # def replace_markdown_image(match):\n        #     img_path = match.group(1)\n        #     resource_info = None\n        #     \n        #     # Try to find resource in our resource map\n        #     for ref, info in self.resource_map.items():\n        #         if Path(ref).name == Path(img_path).name:\n        #             resource_info = info\n        #             break\n        #     \n        #     if resource_info:\n        #         # Calculate image dimensions (default to 440x440 like in the example)\n        #         width = \"440px\"\n        #         height = \"440px\"\n        #         alt = Path(img_path).stem.replace(\'_\', \' \')\n        #         \n        #         return f\'<en-media style=\"--en-naturalWidth:440; --en-naturalHeight:440;\" \' \\\n        #                f\'alt=\"{alt}\" height=\"{height}\" width=\"{width}\" \' \\\n        #                f\'hash=\"{resource_info[\"hash\"]}\" type=\"{resource_info[\"mime\"]}\" />\'\n        #     else:\n        #         return f\'<div>[Image not found: {html.escape(img_path)}]</div>\'\n        #         \n        # result = re.sub(r\'!\\[\\[([^\\]]+)\\]\\]\', replace_markdown_image, result)
 
         # 5. Remove any metadata block at the beginning (content between --- markers)
-        result = re.sub(r'<div>-{3,}</div>.*?<div>-{3,}</div>', '', result, flags=re.DOTALL)
+        result = METADATA_BLOCK_RE.sub('', result)
             
         # Final clean-up
         # Remove empty divs (except those with just <br/>)
-        result = re.sub(r'<div>\s*</div>', '', result)
+        result = EMPTY_DIV_RE.sub('', result)
         
-        # Ensure proper xml:lang attribute
-        result = re.sub(r'<([a-z0-9]+) lang=', r'<\1 xml:lang=', result)
+        # Ensure proper xml:lang attribute (a substring check is much cheaper than
+        # running the regex over a note that has no lang attributes)
+        if ' lang=' in result:
+            result = LANG_ATTRIBUTE_RE.sub(r'<\1 xml:lang=', result)
         
         # Normalize whitespace and remove unnecessary line breaks for cleaner XML
         # Remove all whitespace between tags
-        result = re.sub(r'>\s+<', '><', result, flags=re.DOTALL)
+        result = WHITESPACE_BETWEEN_TAGS_RE.sub('><', result)
         
         return result
         
@@ -538,19 +673,29 @@ class ENMLProcessor:
         Returns:
             Post-processed ENML content
         """
-        # Ensure proper CDATA for scripts, if any survived
-        result = re.sub(r'<script>(.*?)</script>', r'<script><![CDATA[\1]]></script>', enml_content, flags=re.DOTALL)
+        result = enml_content
+        
+        # Ensure proper CDATA for scripts, if any survived (_clean_html removes them)
+        if '<script>' in result:
+            result = SCRIPT_RE.sub(r'<script><![CDATA[\1]]></script>', result)
         
         # Ensure proper xml:lang attribute
-        result = re.sub(r'<([a-z0-9]+) lang=', r'<\1 xml:lang=', result)
+        if ' lang=' in result:
+            result = LANG_ATTRIBUTE_RE.sub(r'<\1 xml:lang=', result)
         
         # Normalize whitespace and remove unnecessary line breaks for cleaner XML
         # Remove all whitespace between tags
-        result = re.sub(r'>\s+<', '><', result, flags=re.DOTALL)
+        result = WHITESPACE_BETWEEN_TAGS_RE.sub('><', result)
         
         return result
 
 
+# Processor reused across calls with the same configuration, so that it is not
+# rebuilt for every note; per-note state (the resource map) is reset by each
+# process_html_to_enml call
+_processor: ConfigMemo[ENMLProcessor] = ConfigMemo(ENMLProcessor)
+
+
 def process_html_to_enml(
     html_content: str, 
     resource_refs: Set[str], 
@@ -568,5 +713,6 @@ def process_html_to_enml(
     Returns:
         Tuple of (enml_content, resources list)
     """
-    processor = ENMLProcessor(config, image_registry)
+    processor = _processor.get(config)
+    processor.image_registry = image_registry or []
     return processor.process_html_to_enml(html_content, resource_refs)
\ No newline at end of file
@@ -2,12 +2,18 @@ import re
 import html
 from typing import Dict, Any, Optional, Tuple, List
 
+from .config import ConfigMemo
+
 # Import markdown libraries directly since we're now requiring them as dependencies
 import markdown
 from markdown.extensions.tables import TableExtension
 from markdown.extensions.fenced_code import FencedCodeExtension
 import commonmark
 
+# Patterns for the basic fallback conversion
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+LINE_BREAK_RE = re.compile(r'\n')
+
 
 class HTMLConverter:
     """Converts processed markdown content to HTML for ENEX conversion."""
@@ -33,6 +39,10 @@ class HTMLConverter:
                 self.extensions.append(TableExtension())
             if self.html_options.get("enable_fenced_code", True):
                 self.extensions.append(FencedCodeExtension())
+                
+        # Python-Markdown compiles its processors on construction, so the
+        # instance is built on first use and reset between documents
+        self._markdown: Optional[markdown.Markdown] = None
 
         # Add custom converters for special markdown elements
         self.custom_converters = [
@@ -62,11 +72,7 @@ class HTMLConverter:
         
         # Convert to HTML using the selected markdown engine
         if self.markdown_engine == "python-markdown":
-            html_content = markdown.markdown(
-                marked_content,
-                extensions=self.extensions,
-                output_format='html5'
-            )
+            html_content = self._get_markdown().reset().convert(marked_content)
         elif self.markdown_engine == "commonmark":
             parser = commonmark.Parser()
             ast = parser.parse(marked_content)
@@ -92,6 +98,16 @@ class HTMLConverter:
             
         return html_content
     
+    def _get_markdown(self) -> markdown.Markdown:
+        """Get the Python-Markdown instance used by this converter.
+        
+        Returns:
+            Markdown instance configured with the enabled extensions
+        """
+        if self._markdown is None:
+            self._markdown = markdown.Markdown(extensions=self.extensions, output_format='html5')
+        return self._markdown
+    
     def _mark_empty_lines(self, content: str) -> str:
         """Mark empty lines with special placeholders that survive markdown conversion.
         
@@ -159,13 +175,13 @@ class HTMLConverter:
             Basic HTML conversion
         """
         # A more reliable approach to paragraph conversion
-        paragraphs = re.split(r'\n\s*\n', markdown_content.strip())
+        paragraphs = PARAGRAPH_BREAK_RE.split(markdown_content.strip())
         html_parts = []
         
         for paragraph in paragraphs:
             # Always process paragraph, even if empty
             # Replace newlines with <br> within paragraphs
-            paragraph = re.sub(r'\n', '<br>\n', paragraph)
+            paragraph = LINE_BREAK_RE.sub('<br>\n', paragraph)
             html_parts.append(f"<p>{paragraph}</p>")
         
         html_content = ''.join(html_parts)
@@ -375,6 +391,11 @@ def replace_horizontal_rules(html_content: str) -> str:
 
     return result
 
+# Converter reused across calls with the same configuration, so that the markdown
+# engine is not rebuilt for every note
+_converter: ConfigMemo[HTMLConverter] = ConfigMemo(HTMLConverter)
+
+
 def convert_markdown_to_html(markdown_content: str, config: Dict[str, Any]) -> str:
     """Convert markdown content to HTML.
 
@@ -385,7 +406,7 @@ def convert_markdown_to_html(markdown_content: str, config: Dict[str, Any]) -> s
     Returns:
         HTML content
     """
-    converter = HTMLConverter(config)
+    converter = _converter.get(config)
     html_content = converter.convert_to_html(markdown_content)
 
     # Apply horizontal rule replacement directly in the HTML converter
@@ -1,10 +1,65 @@
 import re
-import uuid
+import sys
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Set, NamedTuple
 
 from .extract_code_blocks import extract_code_blocks, restore_code_blocks
 
+# Combined image pattern: Match \![alt text](path) OR \![[path]]
+# Group 1: alt text (standard)
+# Group 2: path (standard)
+# Group 3: path (wikilink)
+IMAGE_PATTERN = re.compile(r'\!\[(.*?)\]\((.*?)\)|\!\[\[([^\]]+)\]\]')
+
+# Markdown link format: [text](url)
+LINK_PATTERN = re.compile(r'\[(.*?)\]\((.*?)\)')
+
+# Heading markers at the beginning of a line; [^\S\n] keeps the match on one line
+HEADING_MARKER_PATTERN = re.compile(r'^#{1,6}[^\S\n]+', re.MULTILINE)
+
+INLINE_CODE_PATTERN = re.compile(r'`([^`]*)`')
+WIKI_LINK_PATTERN = re.compile(r'\[\[([^\]]+)\]\]')
+HIGHLIGHT_PATTERN = re.compile(r'==([^=]+)==')
+STRIKETHROUGH_PATTERN = re.compile(r'~~([^~]+)~~')
+
+# (character, replacement) pairs for clean_unicode_characters. Each is applied with
+# str.replace, which skips a string without the character at memchr speed; a
+# str.translate table falls back to a slow per-character path for non-ASCII text
+UNICODE_CLEANUP_REPLACEMENTS = (
+    # Non-breaking space (0xA0) becomes a regular space
+    ('\xa0', ' '),
+    # Directional formatting characters are removed
+    ('\u200e', ''),  # Left-to-right mark
+    ('\u200f', ''),  # Right-to-left mark
+    ('\u202a', ''),  # Left-to-right embedding
+    ('\u202b', ''),  # Right-to-left embedding
+    ('\u202c', ''),  # Pop directional formatting
+    ('\u202d', ''),  # Left-to-right override
+    ('\u202e', ''),  # Right-to-left override
+    ('\u2066', ''),  # Left-to-right isolate
+    ('\u2067', ''),  # Right-to-left isolate
+    ('\u2068', ''),  # First strong isolate
+    ('\u2069', ''),  # Pop directional isolate
+    # Various space characters become a regular space
+    ('\u2000', ' '),  # En Quad
+    ('\u2001', ' '),  # Em Quad
+    ('\u2002', ' '),  # En Space
+    ('\u2003', ' '),  # Em Space
+    ('\u2004', ' '),  # Three-Per-Em Space
+    ('\u2005', ' '),  # Four-Per-Em Space
+    ('\u2006', ' '),  # Six-Per-Em Space
+    ('\u2007', ' '),  # Figure Space
+    ('\u2008', ' '),  # Punctuation Space
+    ('\u2009', ' '),  # Thin Space
+    ('\u200a', ' '),  # Hair Space
+    ('\u205f', ' '),  # Medium Mathematical Space
+    # Zero-width characters are removed
+    ('\u200b', ''),  # Zero Width Space
+    ('\u200c', ''),  # Zero Width Non-Joiner
+    ('\u200d', ''),  # Zero Width Joiner
+    ('\ufeff', ''),  # Zero Width No-Break Space (BOM)
+)
+
 
 class ImageRef(NamedTuple):
     """Represents an image reference found in markdown content."""
@@ -163,8 +218,9 @@ class MarkdownProcessor:
             Content with inline code markers removed
         """
         # Match inline code, handling escaping and nested backticks
-        pattern = r'`([^`]*)`'
-        return re.sub(pattern, r'\1', content)
+        if '`' not in content:
+            return content
+        return INLINE_CODE_PATTERN.sub(r'\1', content)
         
     def remove_heading_markers(self, content: str) -> str:
         """Remove heading markers (# symbols) at the beginning of lines.
@@ -175,12 +231,10 @@ class MarkdownProcessor:
         Returns:
             Content with heading markers removed
         """
-        # Match heading markers at the beginning of lines
-        pattern = r'^(#{1,6})\s+'
-        # Process line by line to only affect actual headings
-        lines = content.split('\n')
-        processed_lines = [re.sub(pattern, '', line) for line in lines]
-        return '\n'.join(processed_lines)
+        # Match heading markers at the beginning of lines, in one pass over the content
+        if '#' not in content:
+            return content
+        return HEADING_MARKER_PATTERN.sub('', content)
         
     def process_image_references(self, content: str) -> str:
         """Extract image references and replace them with position markers.
@@ -205,8 +259,9 @@ class MarkdownProcessor:
                 alt_text = '' # Wikilinks don't have explicit alt text in this format
                 image_path = match.group(3)
 
-            # Generate a unique marker ID
-            marker_id = f"IMG_{uuid.uuid4().hex[:8]}"
+            # Generate a marker ID that is unique within this document and stable
+            # across runs, so identical content always produces identical output
+            marker_id = f"IMG_{len(self.image_registry):08x}"
             position = match.start()
 
             # Normalize the path
@@ -217,8 +272,10 @@ class MarkdownProcessor:
                 # Return a link instead of an image for video URLs
                 return f"<a href=\"{image_path}\">{image_path}</a>"
 
-            # Add to tracked references
+            # Add to tracked references. The same image is usually referenced by
+            # many notes, so intern the path to share one string (and its hash)
             if normalized_path:
+                normalized_path = sys.intern(normalized_path)
                 self.image_references.add(normalized_path)
 
                 # Create image reference and add to registry
@@ -240,12 +297,10 @@ class MarkdownProcessor:
             # If path couldn't be normalized, return an error message
             return f"[Image not found: <a href=\"{image_path}\">{image_path}</a>]"
 
-        # Combine patterns: Match \![alt text](path) OR \![[path]]
-        # Group 1: alt text (standard)
-        # Group 2: path (standard)
-        # Group 3: path (wikilink)
-        pattern = r'\!\[(.*?)\]\((.*?)\)|\!\[\[([^\]]+)\]\]'
-        return re.sub(pattern, process_image, content)
+        # Every image form starts with "![", so skip the regex pass without it
+        if "![" not in content:
+            return content
+        return IMAGE_PATTERN.sub(process_image, content)
         
     def process_links(self, content: str) -> str:
         """Process markdown links.
@@ -269,9 +324,10 @@ class MarkdownProcessor:
             # Just store the link in a format we can recognize later
             return f"[[link:{link_url}|{link_text}]]"
             
-        # Match markdown link format: [text](url)
-        pattern = r'\[(.*?)\]\((.*?)\)'
-        return re.sub(pattern, process_link, content)
+        # Every link contains "](", so skip the regex pass without it
+        if "](" not in content:
+            return content
+        return LINK_PATTERN.sub(process_link, content)
         
     def clean_unicode_characters(self, content: str) -> str:
         """Clean problematic Unicode characters from the content.
@@ -283,58 +339,8 @@ class MarkdownProcessor:
             Cleaned content
         """
         result = content
-        
-        # Replace non-breaking space (0xA0) with regular space
-        result = result.replace('\xa0', ' ')
-        
-        # Clean directional formatting characters
-        characters_to_remove = [
-            '\u200e',  # Left-to-right mark
-            '\u200f',  # Right-to-left mark
-            '\u202a',  # Left-to-right embedding
-            '\u202b',  # Right-to-left embedding
-            '\u202c',  # Pop directional formatting
-            '\u202d',  # Left-to-right override
-            '\u202e',  # Right-to-left override
-            '\u2066',  # Left-to-right isolate
-            '\u2067',  # Right-to-left isolate
-            '\u2068',  # First strong isolate
-            '\u2069',  # Pop directional isolate
-        ]
-        
-        for char in characters_to_remove:
-            result = result.replace(char, '')
-            
-        # Replace various space characters with regular space
-        space_chars = [
-            '\u2000',  # En Quad
-            '\u2001',  # Em Quad
-            '\u2002',  # En Space
-            '\u2003',  # Em Space
-            '\u2004',  # Three-Per-Em Space
-            '\u2005',  # Four-Per-Em Space
-            '\u2006',  # Six-Per-Em Space
-            '\u2007',  # Figure Space
-            '\u2008',  # Punctuation Space
-            '\u2009',  # Thin Space
-            '\u200a',  # Hair Space
-            '\u205f',  # Medium Mathematical Space
-        ]
-        
-        for char in space_chars:
-            result = result.replace(char, ' ')
-            
-        # Zero-width characters to remove
-        zero_width_chars = [
-            '\u200b',  # Zero Width Space
-            '\u200c',  # Zero Width Non-Joiner
-            '\u200d',  # Zero Width Joiner
-            '\ufeff',  # Zero Width No-Break Space (BOM)
-        ]
-        
-        for char in zero_width_chars:
-            result = result.replace(char, '')
-            
+        for char, replacement in UNICODE_CLEANUP_REPLACEMENTS:
+            result = result.replace(char, replacement)
         return result
         
     def handle_special_characters(self, content: str) -> str:
@@ -439,6 +445,10 @@ class MarkdownProcessor:
         Returns:
             Content with star list items replaced by dash list items
         """
+        # Both conversions below need an asterisk
+        if '*' not in content:
+            return content
+            
         # Replace * at the beginning of lines with -
         lines = content.split('\n')
         processed_lines = []
@@ -491,13 +501,16 @@ class MarkdownProcessor:
             
         # Look for [[...]] but don't include the preceding character in the match
         # We'll check it in the process_wiki_link function
-        result = re.sub(r'\[\[([^\]]+)\]\]', process_wiki_link, result)
+        if '[[' in result:
+            result = WIKI_LINK_PATTERN.sub(process_wiki_link, result)
         
         # Process highlighted text ==text== -> text
-        result = re.sub(r'==([^=]+)==', r'\1', result)
+        if '==' in result:
+            result = HIGHLIGHT_PATTERN.sub(r'\1', result)
         
         # Process strikethrough text ~~text~~ -> text
-        result = re.sub(r'~~([^~]+)~~', r'\1', result)
+        if '~~' in result:
+            result = STRIKETHROUGH_PATTERN.sub(r'\1', result)
         
         return result
 
@@ -2,11 +2,15 @@ import os
 import mimetypes
 import hashlib
 import base64
-import uuid
+import binascii
+import functools
+import html
 from pathlib import Path
-from typing import Dict, Any, List, Set, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Set, Tuple, Optional
 import datetime
 
+from .cache import ConversionCache, get_cache, make_cache_key
+
 # Add conditional PIL import
 try:
     from PIL import Image
@@ -15,6 +19,104 @@ except ImportError:
     PIL_AVAILABLE = False
 
 
+# Read size for resource files; a multiple of 90 bytes, so every chunk but the last
+# encodes to whole 120-character lines of base64
+READ_CHUNK_SIZE = 90 * 2048
+
+
+@functools.lru_cache(maxsize=1024)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    """Read a file in chunks and compute its MD5 hash.
+    
+    The modification time and size are part of the cache key so that a file
+    changed on disk is hashed again.
+    
+    Args:
+        path: Path to the file
+        mtime_ns: File modification time in nanoseconds
+        size: File size in bytes
+        
+    Returns:
+        MD5 hex digest
+    """
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def hash_resource_file(file_path: Path, cache: Optional[ConversionCache] = None) -> str:
+    """Get the MD5 hash of a resource file.
+    
+    Hashes are reused within a process, so a resource referenced by many notes
+    is only read once, and across runs when a cache is given. The base64 data
+    itself is not kept in memory; it is streamed from the file when the ENEX
+    output is written.
+    
+    Args:
+        file_path: Path to the resource file
+        cache: Optional conversion cache for persisting hashes between runs
+        
+    Returns:
+        MD5 hex digest
+    """
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    
+    if cache is None:
+        return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+        
+    key = make_cache_key(path, str(stat.st_mtime_ns), str(stat.st_size))
+    result = cache.get("md5", key)
+    if result is None:
+        result = _hash_file(path, stat.st_mtime_ns, stat.st_size)
+        cache.set("md5", key, result)
+    return result
+
+
+def iter_resource_base64(resource_info: Dict[str, Any]) -> Iterator[str]:
+    """Yield the base64 data of a resource piece by piece.
+    
+    Resources read from disk are encoded one READ_CHUNK_SIZE chunk at a time, so
+    the whole file is never held in memory; every piece but the last is a
+    multiple of 120 characters long.
+    
+    Args:
+        resource_info: Resource information dictionary, holding either inline
+            base64 "data" or the "path" of the resource file
+            
+    Yields:
+        Base64 encoded pieces of the resource data
+    """
+    if "data" in resource_info or "path" not in resource_info:
+        yield resource_info.get("data", "")
+        return
+        
+    with open(resource_info["path"], 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield binascii.b2a_base64(chunk, newline=False).decode('ascii')
+
+
+def read_resource_base64(resource_info: Dict[str, Any]) -> str:
+    """Get the base64 data of a resource.
+    
+    Args:
+        resource_info: Resource information dictionary, holding either inline
+            base64 "data" or the "path" of the resource file
+            
+    Returns:
+        Base64 encoded resource data
+    """
+    return "".join(iter_resource_base64(resource_info))
+
+
 class ResourceHandler:
     """Handles the processing of resources for ENEX conversion."""
     
@@ -34,6 +136,7 @@ class ResourceHandler:
         self.max_resource_size = self.resource_options.get("max_resource_size", 50 * 1024 * 1024)  # 50MB default
         self.include_resource_attributes = self.resource_options.get("include_resource_attributes", True)
         self.include_unknown_resources = self.resource_options.get("include_unknown_resources", True)
+        self.cache = get_cache(config)
         
         # Initialize resource maps
         self.resource_map: Dict[str, Dict[str, Any]] = {}
@@ -159,10 +262,10 @@ class ResourceHandler:
         Returns:
             XML string for the resource
         """
-        mime_type = resource_info.get("mime", "application/octet-stream")
-        data_base64 = resource_info.get("data", "")
+        mime_type = html.escape(resource_info.get("mime", "application/octet-stream"), quote=False)
+        data_base64 = read_resource_base64(resource_info)
         md5_hash = resource_info.get("hash", "")
-        filename = resource_info.get("filename", "")
+        filename = html.escape(resource_info.get("filename", ""), quote=False)
         
         xml = f"    <resource>\n"
         xml += f"      <data encoding=\"base64\">{data_base64}</data>\n"
@@ -292,22 +395,15 @@ class ResourceHandler:
             print(f"Warning: Resource {resource_ref} exceeds maximum size limit ({file_size} bytes)")
             return self._create_placeholder_resource(resource_ref)
             
-        # Read file content
-        with open(file_path, 'rb') as f:
-            data = f.read()
-            
-        # Calculate MD5 hash
-        md5_hash = hashlib.md5(data).hexdigest()
+        # Calculate MD5 hash; the base64 data is streamed from the file when writing
+        md5_hash = hash_resource_file(file_path, self.cache)
         
         # Determine MIME type
         mime_type = self._get_mime_type(file_path)
         
-        # Convert to base64
-        data_base64 = base64.b64encode(data).decode('utf-8')
-        
         # Create resource info dictionary first
         resource_info = {
-            "data": data_base64,
+            "path": str(file_path),
             "mime": mime_type,
             "hash": md5_hash,
             "filename": file_path.name,
@@ -348,7 +444,7 @@ class ResourceHandler:
         filename = Path(resource_ref).name
         
         # Convert to base64
-        data_base64 = base64.b64encode(placeholder_data).decode('utf-8')
+        data_base64 = base64.b64encode(placeholder_data).decode('ascii')
         
         # Create resource info
         return {
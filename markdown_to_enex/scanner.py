@@ -1,8 +1,16 @@
 import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Set, Any, Optional, Tuple
 
+# Markdown image references: ![alt](path)
+IMAGE_REF_PATTERN = re.compile(r'!\[.*?\]\((.*?)\)')
+
+# HTML image references: <img src="path" />
+HTML_IMAGE_REF_PATTERN = re.compile(r'<img.*?src=["\'](.*?)["\']')
+
 
 class Note:
     """Represents a markdown note with its metadata and resource references."""
@@ -18,8 +26,10 @@ class Note:
         self.relative_path = relative_path
         self.title = self._extract_title()
         self.resource_refs: Set[str] = set()
-        self.folder_path = str(relative_path.parent) if str(relative_path.parent) != "." else ""
-        self.enex_filename = self._generate_enex_filename()
+        # Notes in the same folder share these strings; interning keeps one copy of
+        # each, and makes grouping by them hash and compare by identity
+        self.folder_path = sys.intern(str(relative_path.parent) if str(relative_path.parent) != "." else "")
+        self.enex_filename = sys.intern(self._generate_enex_filename())
         
     def _extract_title(self) -> str:
         """Extract the title from the file name or content."""
@@ -46,11 +56,10 @@ class Note:
         try:
             content = self.file_path.read_text(encoding='utf-8')
             
-            # Find all markdown image references: ![alt](path)
-            image_refs = re.findall(r'!\[.*?\]\((.*?)\)', content)
-            
-            # Find all HTML image references: <img src="path" />
-            html_refs = re.findall(r'<img.*?src=["\'](.*?)["\']', content)
+            # Only run the regexes when the literal markers are present;
+            # most notes contain no images at all
+            image_refs = IMAGE_REF_PATTERN.findall(content) if "![" in content else []
+            html_refs = HTML_IMAGE_REF_PATTERN.findall(content) if "<img" in content else []
             
             # Combine all references and normalize paths
             all_refs = image_refs + html_refs
@@ -68,6 +77,8 @@ class Note:
         return {
             "file_path": str(self.file_path),
             "relative_path": str(self.relative_path),
+            "name": self.file_path.name,
+            "stem": self.file_path.stem,
             "title": self.title,
             "resource_refs": list(self.resource_refs),
             "folder_path": self.folder_path,
@@ -89,6 +100,9 @@ class DirectoryScanner:
         self.notes: List[Note] = []
         self.directories: Dict[str, List[str]] = {}
         
+        # Reading notes for resource references is I/O bound, so it can use threads
+        self.scan_threads = config.get("processing_options", {}).get("scan_threads", 1)
+        
     def scan(self) -> Dict[str, Any]:
         """Scan the source directory for markdown files and resources.
         
@@ -102,8 +116,13 @@ class DirectoryScanner:
         self._scan_markdown_files()
         
         # Process resource references in notes
-        for note in self.notes:
-            note.scan_resources()
+        if self.scan_threads > 1 and len(self.notes) > 1:
+            with ThreadPoolExecutor(max_workers=self.scan_threads) as executor:
+                for _ in executor.map(Note.scan_resources, self.notes):
+                    pass
+        else:
+            for note in self.notes:
+                note.scan_resources()
             
         # Return the structured representation
         return self._build_result()